@@ -0,0 +1,573 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import math
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+from ovos_utils.log import LOG
+
+from .cache import ResponseCache
+from .metrics import get_metrics
+
+API_KEY = '1'
+API_URL_TEMPLATE = 'https://www.themealdb.com/api/json/v1/{}/'
+API_URL = API_URL_TEMPLATE.format(API_KEY)
+SEARCH = 'search.php'
+RANDOM = 'random.php'
+FILTER = 'filter.php'
+LOOKUP = 'lookup.php'
+
+
+class CircuitBreaker:
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        """Stops calling an upstream that keeps failing.
+
+        The breaker opens after `failure_threshold` consecutive failures and
+        rejects calls until `reset_timeout` seconds have passed. After that a
+        single trial call is let through; its outcome closes or re-opens it.
+
+        Args:
+            failure_threshold (int): consecutive failures that open the breaker
+            reset_timeout (float): seconds to wait before a trial call
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_progress = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """Get the breaker state: "closed", "open" or "half-open"."""
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow_request(self) -> bool:
+        """Check if a call may go upstream right now.
+
+        Returns:
+            bool: False if the breaker is open or a trial call is running
+
+        """
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._trial_in_progress:
+                self._trial_in_progress = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        """Close the breaker after a successful call."""
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_progress = False
+
+    def record_failure(self) -> None:
+        """Count a failed call, opening the breaker past the threshold."""
+        with self._lock:
+            self.failures += 1
+            self._trial_in_progress = False
+            if self.opened_at is not None or \
+                    self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+_priority = threading.local()
+
+
+@contextmanager
+def background_requests(wait: bool = False):
+    """Mark the upstream calls made by the current thread as background.
+
+    Background calls leave the rate limiter's reserve to interactive calls.
+    By default they do not wait for a token either, so an optional fetch is
+    dropped rather than delayed; fetches that must eventually happen, like
+    warming the caches, wait as long as an interactive call would.
+
+    Args:
+        wait (bool): wait for a token instead of giving up at once
+    """
+    previous = (getattr(_priority, 'background', False),
+                getattr(_priority, 'wait', False))
+    _priority.background = True
+    _priority.wait = wait
+    try:
+        yield
+    finally:
+        _priority.background, _priority.wait = previous
+
+
+def is_background() -> bool:
+    return getattr(_priority, 'background', False)
+
+
+def waits_for_tokens() -> bool:
+    """Check if the current thread's background calls wait for a token."""
+    return getattr(_priority, 'wait', False)
+
+
+class TokenBucket:
+
+    def __init__(self, rate: float = 2.0, capacity: int = 10,
+                 reserve: float = 0.5, max_wait: Optional[float] = 2.0):
+        """Token bucket limiting the calls made with the shared API key.
+
+        Interactive calls may wait up to `max_wait` seconds for a token.
+        Background calls only take a token while more than `reserve` of the
+        bucket is left, so a burst of prefetches cannot starve users, and
+        only wait for it when asked to.
+
+        Args:
+            rate (float): tokens added per second
+            capacity (int): largest burst of calls
+            reserve (float): share of the bucket kept for interactive calls
+            max_wait (float): seconds an interactive call waits for a token,
+                None to wait as long as it takes
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.reserve = reserve
+        self.max_wait = max_wait
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, background: bool = False, wait: bool = False) -> bool:
+        """Take a token for one upstream call.
+
+        Args:
+            background (bool): True for prefetches and other background calls
+            wait (bool): let a background call wait up to `max_wait` too
+
+        Returns:
+            bool: False if the call must not go upstream
+
+        """
+        deadline = time.monotonic() + (
+            0 if background and not wait else
+            math.inf if self.max_wait is None else self.max_wait)
+        needed = 1 + self.reserve * self.capacity if background else 1
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens +
+                                   (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= needed:
+                    self._tokens -= 1
+                    return True
+                wait = (needed - self._tokens) / self.rate if self.rate else 0
+            if not wait or now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+class _Flight:
+
+    __slots__ = ('done', 'result', 'background', 'throttled')
+
+    def __init__(self, background: bool = False):
+        """An upstream call other callers of the same query wait for.
+
+        Args:
+            background (bool): True if a background caller started it
+        """
+        self.done = threading.Event()
+        self.result = None
+        self.background = background
+        self.throttled = False
+
+
+class ClientStats:
+
+    def __init__(self):
+        """Counters describing the traffic sent upstream."""
+        self.requests = 0
+        self.failures = 0
+        self.retries = 0
+        self.rejected = 0
+        self.coalesced = 0
+        self.throttled = 0
+        self.stale = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+        self.status_codes = {}
+        self.stages = {}
+        self._lock = threading.Lock()
+
+    def record_response(self, latency: float, status_code: Optional[int]) -> None:
+        """Record a single upstream attempt.
+
+        Args:
+            latency (float): seconds spent waiting for the response
+            status_code (int): HTTP status, None if no response was received
+
+        Returns:
+            None
+
+        """
+        with self._lock:
+            self.requests += 1
+            self.latency_total += latency
+            self.latency_max = max(self.latency_max, latency)
+            self.status_codes[status_code] = \
+                self.status_codes.get(status_code, 0) + 1
+
+    def record_stage(self, stage: str, latency: float) -> None:
+        """Record the duration of one stage of a multi-request search.
+
+        Args:
+            stage (str): stage name, e.g. "filter" or "lookup"
+            latency (float): seconds spent in the stage
+
+        Returns:
+            None
+
+        """
+        with self._lock:
+            count, total, maximum = self.stages.get(stage, (0, 0.0, 0.0))
+            self.stages[stage] = (count + 1, total + latency,
+                                  max(maximum, latency))
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+
+    def record_retry(self) -> None:
+        with self._lock:
+            self.retries += 1
+
+    def record_rejected(self) -> None:
+        with self._lock:
+            self.rejected += 1
+
+    def record_coalesced(self) -> None:
+        with self._lock:
+            self.coalesced += 1
+
+    def record_throttled(self) -> None:
+        with self._lock:
+            self.throttled += 1
+
+    def record_stale(self) -> None:
+        with self._lock:
+            self.stale += 1
+
+    def snapshot(self) -> dict:
+        """Get a copy of the counters.
+
+        Returns:
+            dict: counter names mapped to their values
+
+        """
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "failures": self.failures,
+                "retries": self.retries,
+                "rejected": self.rejected,
+                "coalesced": self.coalesced,
+                "throttled": self.throttled,
+                "stale": self.stale,
+                "latency_avg": self.latency_total / self.requests
+                if self.requests else 0.0,
+                "latency_max": self.latency_max,
+                "status_codes": dict(self.status_codes),
+                "stages": {stage: {"count": count,
+                                   "latency_avg": total / count,
+                                   "latency_max": maximum}
+                           for stage, (count, total, maximum)
+                           in self.stages.items()},
+            }
+
+
+class MealDBClient:
+
+    retry_status_codes = frozenset((429, 500, 502, 503, 504))
+
+    def __init__(self, base_url: str = API_URL,
+                 connect_timeout: float = 3.05,
+                 read_timeout: float = 10.0,
+                 max_retries: int = 2,
+                 backoff_base: float = 0.25,
+                 backoff_cap: float = 2.0,
+                 pool_size: int = 10,
+                 breaker: Optional[CircuitBreaker] = None,
+                 cache: Optional[ResponseCache] = None,
+                 limiter: Optional[TokenBucket] = None):
+        """Pooled HTTP client shared by all TheMealDB searches.
+
+        A single keep-alive `requests.Session` is reused for every call, so
+        consecutive searches skip the TCP and TLS handshakes. It is created,
+        and `requests` imported, on the first call rather than at startup. Concurrent
+        calls for the same query share one upstream request. When the rate
+        limiter or the circuit breaker keeps a call from going upstream, an
+        expired cached response is returned if there is one.
+
+        Args:
+            base_url (str): API root, endpoints are appended to it
+            connect_timeout (float): seconds to wait for a connection
+            read_timeout (float): seconds to wait for the response body
+            max_retries (int): extra attempts after a retryable failure
+            backoff_base (float): base delay for the exponential backoff
+            backoff_cap (float): upper bound for a single backoff delay
+            pool_size (int): keep-alive connections kept per host
+            breaker (CircuitBreaker): breaker guarding the upstream
+            cache (ResponseCache): optional cache consulted before any call
+            limiter (TokenBucket): rate limit for the calls sent upstream
+        """
+        self.base_url = base_url if base_url.endswith('/') else base_url + '/'
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.breaker = breaker or CircuitBreaker()
+        self.cache = cache
+        self.limiter = limiter or TokenBucket()
+        self.stats = ClientStats()
+        self._flights = {}
+        self._flights_lock = threading.Lock()
+        self.pool_size = pool_size
+        self._adapter = None
+        self._session = None
+        self._session_lock = threading.Lock()
+
+    @property
+    def session(self):
+        """Get the pooled `requests.Session`, creating it on first use."""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+                    self._adapter = HTTPAdapter(pool_connections=1,
+                                                pool_maxsize=self.pool_size)
+                    session = requests.Session()
+                    session.mount("http://", self._adapter)
+                    session.mount("https://", self._adapter)
+                    self._session = session
+        return self._session
+
+    def get_json(self, endpoint: str, params: Optional[dict] = None) -> Optional[dict]:
+        """Call an API endpoint and decode its JSON body.
+
+        Args:
+            endpoint (str): endpoint name relative to the base url
+            params (dict): query parameters
+
+        Returns:
+            dict: the decoded response, None if the request failed
+
+        """
+        metrics = get_metrics()
+        if self.cache:
+            cached = self.cache.get(endpoint, params)
+            metrics.inc("recipes_cache_requests_total", endpoint=endpoint,
+                        outcome="miss" if cached is None else "hit")
+            if cached is not None:
+                return cached
+        key = ResponseCache.make_key(endpoint, params)
+        with self._flights_lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight(is_background())
+        if not leader:
+            self.stats.record_coalesced()
+            metrics.inc("recipes_coalesced_requests_total", endpoint=endpoint)
+            flight.done.wait()
+            if flight.result is None and flight.throttled and \
+                    flight.background and not is_background():
+                # the limiter would have let this caller wait for a token
+                return self.get_json(endpoint, params)
+            return flight.result
+        try:
+            if self._acquire(endpoint):
+                flight.result = self._fetch_json(endpoint, params)
+            else:
+                flight.throttled = True
+            if self.cache and flight.result is not None:
+                self.cache.put(endpoint, params, flight.result)
+            elif self.cache:
+                flight.result = self.cache.get_stale(endpoint, params)
+                if flight.result is not None:
+                    self.stats.record_stale()
+                    metrics.inc("recipes_cache_requests_total",
+                                endpoint=endpoint, outcome="stale")
+        finally:
+            # the response is cached before the flight ends, so later
+            # callers find it there instead of starting a new request
+            with self._flights_lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.result
+
+    def _acquire(self, endpoint: str) -> bool:
+        """Take a rate limiter token at the calling thread's priority."""
+        background = is_background()
+        if self.limiter.acquire(background, waits_for_tokens()):
+            return True
+        self.stats.record_throttled()
+        get_metrics().inc("recipes_throttled_requests_total", endpoint=endpoint,
+                          priority="background" if background else "interactive")
+        LOG.warning(f"Rate limit reached, skipping request to {endpoint}")
+        return False
+
+    def _fetch_json(self, endpoint: str, params: Optional[dict]) -> Optional[dict]:
+        """Get an endpoint from upstream, retrying transient failures.
+
+        The caller has taken a rate limiter token, before the breaker is
+        asked so a throttled call cannot hold its trial slot.
+        """
+        metrics = get_metrics()
+        if not self.breaker.allow_request():
+            self.stats.record_rejected()
+            LOG.warning(f"Circuit open, skipping request to {endpoint}")
+            return None
+        # imported with the session, on the first request
+        from requests import RequestException
+        url = self.base_url + endpoint
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self.stats.record_retry()
+                time.sleep(self._backoff(attempt))
+            start = time.monotonic()
+            try:
+                r = self.session.get(url, params=params, timeout=self.timeout)
+            except RequestException as e:
+                self.stats.record_response(time.monotonic() - start, None)
+                metrics.inc("recipes_upstream_responses_total",
+                            endpoint=endpoint, status="error")
+                LOG.warning(f"Request to {endpoint} failed: {e}")
+                continue
+            latency = time.monotonic() - start
+            self.stats.record_response(latency, r.status_code)
+            metrics.observe("recipes_upstream_seconds", latency,
+                            endpoint=endpoint)
+            metrics.inc("recipes_upstream_responses_total",
+                        endpoint=endpoint, status=r.status_code)
+            if r.status_code in self.retry_status_codes:
+                continue
+            # the upstream answered, so it is not down even if the request
+            # itself was bad
+            self.breaker.record_success()
+            if not 200 <= r.status_code < 300:
+                self.stats.record_failure()
+                return None
+            try:
+                with metrics.timer("recipes_json_decode_seconds",
+                                   endpoint=endpoint):
+                    return r.json()
+            except ValueError:
+                LOG.warning(f"Invalid JSON returned by {endpoint}")
+                self.stats.record_failure()
+                return None
+        self.stats.record_failure()
+        self.breaker.record_failure()
+        return None
+
+    def _backoff(self, attempt: int) -> float:
+        """Get a full-jitter delay before the given retry attempt."""
+        return random.uniform(0, min(self.backoff_cap,
+                                     self.backoff_base * 2 ** attempt))
+
+    def connection_stats(self) -> dict:
+        """Get keep-alive pool usage.
+
+        Returns:
+            dict: opened connections, requests sent and requests that
+                reused an already open connection
+
+        """
+        connections = 0
+        pool_requests = 0
+        if self._adapter is None:
+            return {"connections": 0, "requests": 0, "reused": 0}
+        pools = self._adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            connections += pool.num_connections
+            pool_requests += pool.num_requests
+        return {"connections": connections,
+                "requests": pool_requests,
+                "reused": max(pool_requests - connections, 0)}
+
+    def close(self) -> None:
+        """Close all pooled connections."""
+        if self._session is not None:
+            self._session.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> MealDBClient:
+    """Get the module-level client, creating it on first use.
+
+    Returns:
+        MealDBClient: the shared client
+
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = MealDBClient()
+    return _client
+
+
+def set_client(client: Optional[MealDBClient]) -> None:
+    """Replace the module-level client, e.g. to point it at a stub server.
+
+    Args:
+        client (MealDBClient): the new shared client, None to reset it
+
+    Returns:
+        None
+
+    """
+    global _client
+    with _client_lock:
+        if _client is not None and _client is not client:
+            _client.close()
+        _client = client
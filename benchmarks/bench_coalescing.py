@@ -0,0 +1,85 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Upstream requests made by bursts of identical concurrent searches."""
+
+import threading
+from time import perf_counter
+
+from skill_recipes.api_client import RANDOM, SEARCH, MealDBClient
+from benchmarks.common import load_corpus, report, unlimited
+from benchmarks.fake_mealdb import FakeMealDB
+
+QUERIES = {
+    'random': (RANDOM, None),
+    'by name': (SEARCH, {'s': 'chicken'}),
+}
+CALLERS = (1, 10, 50)
+
+
+def burst(client: MealDBClient, endpoint: str, params, callers: int) -> dict:
+    """Start identical requests from several threads at the same moment."""
+    barrier = threading.Barrier(callers)
+    results = [None] * callers
+
+    def call(i):
+        barrier.wait()
+        # half the callers ask in upper case, which normalizes to the same key
+        query = params if i % 2 or not params else \
+            {k: v.upper() for k, v in params.items()}
+        results[i] = client.get_json(endpoint, query)
+
+    threads = [threading.Thread(target=call, args=(i,))
+               for i in range(callers)]
+    start = perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = perf_counter() - start
+    return {'elapsed_ms': round(elapsed * 1000, 1),
+            'answered': sum(result is not None for result in results)}
+
+
+def run(latency: float = 0.05) -> None:
+    corpus = load_corpus()
+    with FakeMealDB(corpus, latency=latency) as fake:
+        for name, (endpoint, params) in QUERIES.items():
+            for callers in CALLERS:
+                # no response cache, so every burst has to go upstream
+                client = MealDBClient(fake.url, limiter=unlimited())
+                fake.reset()
+                result = burst(client, endpoint, params, callers)
+                result['upstream_requests'] = fake.requests
+                result['coalesced'] = client.stats.snapshot()['coalesced']
+                report(f'{name} x{callers}', result)
+                client.close()
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,117 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Intent-to-speak latency of every intent handler.
+
+Dialogs are not rendered: `speak_dialog` only records the time it was first
+called, so the numbers cover search, parsing and session handling. Recitation
+speaks from a background thread; its latency runs up to the first step it
+hands to TTS.
+"""
+
+from threading import Event
+from time import perf_counter
+
+from mycroft import Message
+
+from skill_recipes import RecipeSkill
+from skill_recipes.api_client import MealDBClient, set_client
+from skill_recipes.cache import ResponseCache
+from skill_recipes.prefetch import Prefetcher, RequestBudget
+from skill_recipes.recipe_index import LocalRecipeIndex, set_index
+from benchmarks.common import load_corpus, report, unlimited
+from benchmarks.fake_mealdb import FakeMealDB
+
+
+class BenchmarkSkill(RecipeSkill):
+
+    def __init__(self):
+        """RecipeSkill without a message bus, recording speak calls."""
+        self._create_state()
+        self.prefetcher = Prefetcher(RequestBudget(0))
+        self.first_speak = None
+        self.spoke = Event()
+
+    def speak_dialog(self, key, data=None, expect_response=False, wait=False,
+                     message=None):
+        if self.first_speak is None:
+            self.first_speak = perf_counter()
+            self.spoke.set()
+
+    def stop_recitations(self):
+        for recitation in list(self._recitations.values()):
+            recitation.cancel()
+            recitation.join()
+
+
+HANDLERS = (
+    ('handle_search_recipe_by_name', {'recipe_name': 'lasagne'}),
+    ('handle_search_recipe_by_ingredient', {'ingredient': 'garlic'}),
+    ('handle_search_random', {}),
+    ('handle_get_recipe_name', {}),
+    ('handle_get_ingredients', {}),
+    ('handle_get_ingredient_quantity', {'ingredient': 'garlic'}),
+    ('handle_get_current_step', {}),
+    ('handle_get_next_step', {}),
+    ('handle_get_previous_step', {}),
+    ('handle_recite_instructions', {}),
+)
+
+
+def run(repeat: int = 200, latency: float = 0.005) -> None:
+    with FakeMealDB(load_corpus(), latency=latency) as fake:
+        set_client(MealDBClient(fake.url, cache=ResponseCache(),
+                                limiter=unlimited()))
+        set_index(LocalRecipeIndex())
+        skill = BenchmarkSkill()
+        for name, data in HANDLERS:
+            handler = getattr(skill, name)
+            timings = []
+            for _ in range(repeat):
+                message = Message('recipes.benchmark', data,
+                                  {'username': 'benchmark'})
+                # a running recitation must not speak into the next sample
+                skill.stop_recitations()
+                skill.first_speak = None
+                skill.spoke.clear()
+                start = perf_counter()
+                handler(message)
+                if not skill.spoke.wait(timeout=5):
+                    raise RuntimeError(f'{name} did not speak')
+                timings.append((skill.first_speak - start) * 1e6)
+            timings.sort()
+            report(name, {'n': repeat,
+                          'p50_us': timings[repeat // 2],
+                          'p95_us': timings[int(repeat * 0.95) - 1],
+                          'max_us': timings[-1]})
+        skill.stop_recitations()
+        set_client(None)
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,64 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Parse throughput of recipe payloads, in recipes per second."""
+
+from time import perf_counter
+
+from skill_recipes import RecipeSkill
+from skill_recipes.recipe_utils import Recipe
+from benchmarks.common import load_corpus, measure, report
+
+
+def run(rounds: int = 2000) -> None:
+    corpus = load_corpus()
+    recipes = [Recipe(recipe_data) for recipe_data in corpus]
+
+    start = perf_counter()
+    for _ in range(rounds):
+        for recipe_data in corpus:
+            Recipe(recipe_data)
+    elapsed = perf_counter() - start
+    report('parse Recipe', {'recipes_per_s': rounds * len(corpus) / elapsed})
+
+    report('_get_instructions', measure(
+        lambda: [RecipeSkill._get_instructions(r) for r in corpus], rounds))
+    report('_get_ingredients', measure(
+        lambda: [RecipeSkill._get_ingredients(r) for r in corpus], rounds))
+    # only the unit settings of the skill instance are used
+    for unit_system in (None, 'metric'):
+        skill = RecipeSkill.__new__(RecipeSkill)
+        skill._create_state()
+        skill.unit_system = unit_system
+        report(f'_to_string_ingredients ({unit_system or "as written"})',
+               measure(lambda: [RecipeSkill._to_string_ingredients(skill, r)
+                                for r in recipes], rounds))
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,81 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Latency of the search strategies against a local fake TheMealDB."""
+
+from mycroft import Message
+
+from skill_recipes import execute_search_by_ingredient, \
+    execute_search_by_name, execute_search_random
+from skill_recipes.api_client import MealDBClient, set_client
+from skill_recipes.cache import ResponseCache
+from skill_recipes.recipe_index import LocalRecipeIndex, set_index
+from skill_recipes.title_index import TitleIndex, set_titles
+from benchmarks.common import load_corpus, measure, report, unlimited
+from benchmarks.fake_mealdb import FakeMealDB
+
+QUERIES = {
+    'random': (execute_search_random, {}),
+    'by name': (execute_search_by_name, {'recipe_name': 'lasagne'}),
+    'by misheard name': (execute_search_by_name, {'recipe_name': 'lazagna'}),
+    'by ingredient': (execute_search_by_ingredient, {'ingredient': 'garlic'}),
+    'by two ingredients': (execute_search_by_ingredient,
+                           {'ingredient': 'garlic and onion'}),
+}
+
+
+def run(repeat: int = 200, latency: float = 0.005) -> None:
+    corpus = load_corpus()
+    with FakeMealDB(corpus, latency=latency) as fake:
+        titles = TitleIndex()
+        titles.add_meals(corpus)
+        for setup, cache, index, title_index in (
+                ('remote', None, LocalRecipeIndex(), TitleIndex()),
+                ('cached', ResponseCache(), LocalRecipeIndex(), TitleIndex()),
+                ('titles', ResponseCache(), LocalRecipeIndex(), titles),
+                ('local', None, LocalRecipeIndex(corpus), titles)):
+            client = MealDBClient(fake.url, cache=cache, limiter=unlimited())
+            set_client(client)
+            set_index(index)
+            set_titles(title_index)
+            for name, (strategy, data) in QUERIES.items():
+                fake.reset()
+                message = Message('recipes.benchmark', data,
+                                  {'username': 'benchmark'})
+                result = measure(lambda: strategy(message), repeat)
+                result['upstream_per_call'] = fake.requests / (repeat + 10)
+                report(f'{setup} {name}', result)
+            conn = client.connection_stats()
+            report(f'{setup} connections', conn)
+        set_client(None)
+        set_index(LocalRecipeIndex())
+        set_titles(TitleIndex())
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,85 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Accuracy and throughput of instruction segmentation.
+
+The current segmenter is compared with the original approach of deleting
+line breaks and splitting on every period. Accuracy is measured on the
+hand-labelled cases in corpus/segmentation.json: edge cases such as numbered
+steps and decimals, and the instructions of the recorded TheMealDB recipes
+(marked with their "source"). Throughput is measured on the recorded recipe
+payloads.
+"""
+
+import json
+import re
+from os.path import dirname, join
+from time import perf_counter
+
+from skill_recipes.segmentation import iter_steps
+from benchmarks.common import load_corpus, report
+
+CASES_PATH = join(dirname(__file__), 'corpus', 'segmentation.json')
+
+
+def legacy_steps(instruction_text: str) -> list:
+    instruction_text = re.sub(r'\r+', '', instruction_text)
+    instruction_text = re.sub(r'\n+', '', instruction_text)
+    return [step for step in instruction_text.split('.') if step]
+
+
+def current_steps(instruction_text: str) -> list:
+    return list(iter_steps(instruction_text))
+
+
+def run(rounds: int = 500) -> None:
+    with open(CASES_PATH, encoding='utf-8') as f:
+        cases = json.load(f)
+    texts = [meal['strInstructions'] for meal in load_corpus()]
+    for name, segment in (('legacy', legacy_steps),
+                          ('current', current_steps)):
+        exact = 0
+        count_error = 0
+        for case in cases:
+            steps = [step.strip() for step in segment(case['text'])]
+            exact += steps == case['steps']
+            count_error += abs(len(steps) - len(case['steps']))
+
+        start = perf_counter()
+        for _ in range(rounds):
+            for text in texts:
+                segment(text)
+        elapsed = perf_counter() - start
+        report(f'{name} segmentation', {
+            'exact_match': exact / len(cases),
+            'mean_step_count_error': count_error / len(cases),
+            'recipes_per_s': rounds * len(texts) / elapsed})
+
+
+if __name__ == '__main__':
+    run()
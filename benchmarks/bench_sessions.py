@@ -0,0 +1,73 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Memory held per stored cooking session for many simulated users."""
+
+import json
+import tracemalloc
+
+from skill_recipes.recipe_utils import Recipe, RecipeStorage
+from benchmarks.common import load_corpus, report
+
+USER_COUNTS = (1000, 10000, 100000)
+
+
+def _fresh_payloads(corpus: list, count: int) -> list:
+    """Decode the corpus again per user, as separate API responses would."""
+    encoded = [json.dumps(recipe_data) for recipe_data in corpus]
+    return [json.loads(encoded[i % len(encoded)]) for i in range(count)]
+
+
+def run(user_counts=USER_COUNTS) -> None:
+    corpus = load_corpus()
+    for users in user_counts:
+        tracemalloc.start()
+        raw = {f'user{i}': payload for i, payload
+               in enumerate(_fresh_payloads(corpus, users))}
+        raw_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del raw
+
+        storage = RecipeStorage(max_users=users)
+        tracemalloc.start()
+        payloads = _fresh_payloads(corpus, users)
+        for i in range(users):
+            storage.assign_recipe(f'user{i}', Recipe(payloads[i]))
+        # only what the sessions keep alive should be counted
+        del payloads
+        traced = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        report(f'{users} sessions', {
+            'raw_dict_bytes_per_user': raw_bytes / users,
+            'traced_bytes_per_user': traced / users,
+            'accounted_bytes_per_user': storage.stats()['bytes'] / users})
+
+
+if __name__ == '__main__':
+    run()
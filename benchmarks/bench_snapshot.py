@@ -0,0 +1,101 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Size, load time and memory of the JSON corpus against a snapshot."""
+
+import json
+import os
+import tempfile
+import tracemalloc
+from time import perf_counter
+
+from skill_recipes.recipe_utils import Recipe
+from skill_recipes.snapshot import Snapshot, write_snapshot
+from benchmarks.common import load_corpus, measure, report
+
+
+def _scaled_corpus(copies: int) -> list:
+    """Repeat the corpus under new ids, like a full TheMealDB dump.
+
+    The copies share their strings, which flatters the snapshot size; load
+    times and per-recipe costs are unaffected.
+    """
+    corpus = load_corpus()
+    return [dict(recipe_data, idMeal=f'{copy}{recipe_data["idMeal"]}')
+            for copy in range(copies) for recipe_data in corpus]
+
+
+def run(copies: int = 40) -> None:
+    corpus = _scaled_corpus(copies)
+    with tempfile.TemporaryDirectory() as directory:
+        json_path = os.path.join(directory, 'recipes.json')
+        snapshot_path = os.path.join(directory, 'recipes.snapshot')
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump({'meals': corpus}, f)
+        start = perf_counter()
+        write_snapshot(corpus, snapshot_path)
+        report('convert', {'recipes': len(corpus),
+                           'ms': (perf_counter() - start) * 1000})
+        report('file size', {'json_bytes': os.path.getsize(json_path),
+                             'snapshot_bytes': os.path.getsize(snapshot_path)})
+
+        def load_json():
+            with open(json_path, encoding='utf-8') as f:
+                return json.load(f)['meals']
+
+        def load_snapshot():
+            with Snapshot(snapshot_path):
+                pass
+
+        report('open json', measure(load_json, repeat=20, warmup=2))
+        report('open snapshot', measure(load_snapshot, repeat=20, warmup=2))
+
+        # what a process holds to answer lookups: the decoded dump, or the
+        # mapped snapshot whose pages are shared with other processes
+        tracemalloc.start()
+        raw = load_json()
+        raw_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        tracemalloc.start()
+        snapshot = Snapshot(snapshot_path)
+        snapshot_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        report('resident', {'json_bytes': raw_bytes,
+                            'snapshot_heap_bytes': snapshot_bytes})
+
+        by_id = {recipe_data['idMeal']: recipe_data for recipe_data in raw}
+        meal_id = corpus[len(corpus) // 2]['idMeal']
+        report('recipe from dict',
+               measure(lambda: Recipe(by_id[meal_id]), repeat=2000))
+        report('recipe from snapshot',
+               measure(lambda: snapshot.recipe(meal_id), repeat=2000))
+        snapshot.close()
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,73 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""Latency of searches answered by the fastest of several TheMealDB servers."""
+
+from time import perf_counter
+
+from skill_recipes.api_client import MealDBClient, set_client
+from skill_recipes.data_sources import MealDBSource, MultiSource
+from benchmarks.common import load_corpus, report, unlimited
+from benchmarks.fake_mealdb import FakeMealDB
+
+REPEAT = 20
+
+
+def timed(sources: MultiSource, meal_ids: list) -> dict:
+    """Look up recipes one after the other, without any cache."""
+    timings = []
+    answered = 0
+    for meal_id in meal_ids:
+        start = perf_counter()
+        answered += sources.lookup(meal_id) is not None
+        timings.append((perf_counter() - start) * 1000)
+    timings.sort()
+    return {'p50_ms': timings[len(timings) // 2],
+            'max_ms': timings[-1],
+            'answered': answered}
+
+
+def run() -> None:
+    corpus = load_corpus()
+    meal_ids = [corpus[i % len(corpus)]['idMeal'] for i in range(REPEAT)]
+    with FakeMealDB(corpus, latency=0.2) as slow, \
+            FakeMealDB(corpus, latency=0.02) as fast:
+        scenarios = {
+            'slow server': [(slow, 5.0)],
+            'slow server + fast mirror': [(slow, 5.0), (fast, 5.0)],
+            'slow server, 50 ms deadline': [(slow, 0.05)],
+        }
+        for name, servers in scenarios.items():
+            # the shared client is only consulted for its (missing) cache
+            set_client(MealDBClient(slow.url, limiter=unlimited()))
+            sources = MultiSource(
+                MealDBSource(MealDBClient(fake.url, limiter=unlimited()),
+                             name=fake.url, deadline=deadline)
+                for fake, deadline in servers)
+            report(name, timed(sources, meal_ids))
+            sources.close()
+        set_client(None)
@@ -0,0 +1,109 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Import time of the skill modules, each measured in a fresh interpreter.
+
+The skill is loaded on every device boot, so importing each module must stay
+within its budget in `BUDGETS` and must not pull in the modules deferred
+for it; `requests` is imported when the first API request needs it and
+`sqlite3` when a cache or session store is configured. Importing the
+package loads the skill, as skill loaders do; the other modules are timed
+with the voice framework hidden, as the batch service imports them.
+"""
+
+import statistics
+import subprocess
+import sys
+
+from benchmarks.common import report
+
+# without them, the package skips importing the skill
+VOICE_FRAMEWORK = ('mycroft', 'neon_utils')
+
+# module: (milliseconds on a development machine with warm disk caches,
+#          modules the import must not load, modules hidden from it)
+BUDGETS = {
+    'skill_recipes': (1000, ('requests',), ()),
+    'skill_recipes.recipe_utils': (50, ('requests', 'sqlite3'),
+                                   VOICE_FRAMEWORK),
+    'skill_recipes.api_client': (100, ('requests',), VOICE_FRAMEWORK),
+    'skill_recipes.recipe_service': (200, ('requests',), VOICE_FRAMEWORK),
+}
+
+# a None entry in sys.modules makes importing that module fail
+_PROBE = ("import sys, time; sys.modules.update(dict.fromkeys({hidden!r})); "
+          "start = time.perf_counter(); import {module}; "
+          "print(time.perf_counter() - start); "
+          "print(*[name for name in {deferred!r} if name in sys.modules])")
+
+
+def import_time(module: str, deferred: tuple = (), hidden: tuple = (),
+                repeat: int = 10) -> dict:
+    """Time importing a module in new interpreters.
+
+    Args:
+        module (str): the module to import
+        deferred (tuple): modules the import must not load
+        hidden (tuple): modules made unimportable first
+        repeat (int): interpreters started
+
+    Returns:
+        dict: median and max import time in ms, and the deferred modules the
+            import loaded anyway
+
+    """
+    timings = []
+    loaded = ''
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, '-c',
+             _PROBE.format(module=module, deferred=deferred,
+                           hidden=hidden)],
+            capture_output=True, text=True, check=True).stdout.splitlines()
+        timings.append(float(output[-2]) * 1000)
+        loaded = output[-1]
+    return {'p50_ms': statistics.median(timings),
+            'max_ms': max(timings),
+            'loaded': loaded or '-'}
+
+
+def run(repeat: int = 10) -> None:
+    for module, (budget, deferred, hidden) in BUDGETS.items():
+        try:
+            result = import_time(module, deferred, hidden, repeat)
+        except subprocess.CalledProcessError as e:
+            report(module, {'error': e.stderr.strip().splitlines()[-1]})
+            continue
+        result['budget_ms'] = budget
+        result['within_budget'] = result['p50_ms'] <= budget and \
+            result['loaded'] == '-'
+        report(module, result)
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,84 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import json
+import statistics
+from os.path import dirname, join
+from time import perf_counter
+from typing import Callable, List
+
+from skill_recipes.api_client import TokenBucket
+
+CORPUS_PATH = join(dirname(__file__), 'corpus', 'meals.json')
+
+
+def unlimited() -> TokenBucket:
+    """A rate limiter that never throttles the fake server."""
+    return TokenBucket(rate=1e9, capacity=10 ** 9)
+
+
+def load_corpus(path: str = CORPUS_PATH) -> List[dict]:
+    """Load the recorded TheMealDB payloads."""
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)['meals']
+
+
+def measure(func: Callable, repeat: int = 1000, warmup: int = 10) -> dict:
+    """Time repeated calls of a function.
+
+    Args:
+        func (Callable): function called without arguments
+        repeat (int): measured calls
+        warmup (int): unmeasured calls made first
+
+    Returns:
+        dict: call count and mean/p50/p95/max durations in microseconds
+
+    """
+    for _ in range(warmup):
+        func()
+    timings = []
+    for _ in range(repeat):
+        start = perf_counter()
+        func()
+        timings.append((perf_counter() - start) * 1e6)
+    timings.sort()
+    return {'n': repeat,
+            'mean_us': statistics.fmean(timings),
+            'p50_us': timings[len(timings) // 2],
+            'p95_us': timings[int(len(timings) * 0.95) - 1],
+            'max_us': timings[-1]}
+
+
+def report(name: str, result: dict) -> None:
+    """Print one benchmark result as an aligned line."""
+    values = '  '.join(f'{key}={value:,.1f}' if isinstance(value, float)
+                       else f'{key}={value:,}' if type(value) is int
+                       else f'{key}={value}'
+                       for key, value in result.items())
+    print(f'{name:<40} {values}')
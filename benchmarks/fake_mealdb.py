@@ -0,0 +1,169 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import json
+import random
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+from typing import List, Optional
+from urllib.parse import parse_qs, urlparse
+
+API_PREFIX = '/api/json/v1/1/'
+
+
+class FakeMealDB:
+
+    def __init__(self, meals: List[dict], latency: float = 0.0):
+        """Local HTTP server answering TheMealDB endpoints from a corpus.
+
+        Args:
+            meals (list): TheMealDB-format recipes to serve
+            latency (float): seconds every response is delayed by
+        """
+        self.meals = meals
+        self.latency = latency
+        self.requests = 0
+        self.paths = []
+        # answered in order before any normal response, e.g. [503, 503]
+        self.statuses = []
+        self._lock = Lock()
+        self._server = None
+
+    @property
+    def url(self) -> str:
+        """Base url to pass to `MealDBClient`."""
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}{API_PREFIX}'
+
+    def start(self) -> 'FakeMealDB':
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                status = fake.record(self.path)
+                if fake.latency:
+                    time.sleep(fake.latency)
+                body = json.dumps(fake.respond(self.path) if status == 200
+                                  else {'error': status}).encode()
+                try:
+                    self.send_response(status)
+                    self.send_header('Content-Type', 'application/json')
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                except ConnectionError:
+                    # the client timed out and hung up
+                    pass
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def reset(self) -> None:
+        with self._lock:
+            self.requests = 0
+            self.paths = []
+            self.statuses = []
+
+    def record(self, path: str) -> int:
+        """Count a request and get the status code to answer it with."""
+        with self._lock:
+            self.requests += 1
+            self.paths.append(path)
+            return self.statuses.pop(0) if self.statuses else 200
+
+    def respond(self, path: str) -> dict:
+        """Build the response body TheMealDB would return for a path."""
+        url = urlparse(path)
+        endpoint = url.path[len(API_PREFIX):]
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        if endpoint == 'random.php':
+            return {'meals': [random.choice(self.meals)]}
+        if endpoint == 'lookup.php':
+            return {'meals': [m for m in self.meals
+                              if m['idMeal'] == query.get('i')] or None}
+        if endpoint == 'search.php':
+            if 'f' in query:
+                letter = query['f'].lower()
+                return {'meals': [m for m in self.meals if m['strMeal']
+                                  .lower().startswith(letter)] or None}
+            name = query.get('s', '').lower()
+            return {'meals': [m for m in self.meals
+                              if name in m['strMeal'].lower()] or None}
+        if endpoint == 'filter.php':
+            ingredient = query.get('i', '').replace('_', ' ').lower()
+            return {'meals': [{'strMeal': m['strMeal'],
+                               'strMealThumb': m['strMealThumb'],
+                               'idMeal': m['idMeal']}
+                              for m in self.meals
+                              if self._uses(m, ingredient)] or None}
+        return {'meals': None}
+
+    @staticmethod
+    def _uses(meal: dict, ingredient: str) -> bool:
+        for i in range(1, 21):
+            value = meal.get('strIngredient' + str(i))
+            if value and value.lower() == ingredient:
+                return True
+        return False
+
+    def __enter__(self) -> 'FakeMealDB':
+        return self.start()
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+
+def main(port: Optional[int] = None):
+    """Serve the recorded corpus until interrupted."""
+    from benchmarks.common import load_corpus
+    fake = FakeMealDB(load_corpus()).start()
+    print(f"Serving {len(fake.meals)} recipes at {fake.url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        fake.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Run every benchmark.
+
+Usage, from the repository root with the skill installed:
+    python -m benchmarks.run [parsing|segmentation|search|coalescing|handlers|
+                             sessions|snapshot|sources|startup ...]
+"""
+
+import sys
+
+from benchmarks import bench_coalescing, bench_handlers, bench_parsing, \
+    bench_search, bench_segmentation, bench_sessions, bench_snapshot, \
+    bench_sources, bench_startup
+
+SUITES = {
+    'parsing': bench_parsing,
+    'segmentation': bench_segmentation,
+    'search': bench_search,
+    'coalescing': bench_coalescing,
+    'handlers': bench_handlers,
+    'sessions': bench_sessions,
+    'snapshot': bench_snapshot,
+    'sources': bench_sources,
+    'startup': bench_startup,
+}
+
+
+def main(names=None) -> None:
+    for name in names or SUITES:
+        print(f'== {name} ==')
+        SUITES[name].run()
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
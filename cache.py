@@ -0,0 +1,302 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode
+
+from ovos_utils.log import LOG
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+class ResponseCache:
+
+    # seconds an API response stays fresh, per endpoint; 0 disables caching
+    default_ttls = {
+        'search.php': 24 * 3600,
+        'filter.php': 24 * 3600,
+        'lookup.php': 7 * 24 * 3600,
+        'random.php': 0,
+    }
+
+    def __init__(self, max_entries: int = 512, ttls: Optional[dict] = None,
+                 default_ttl: float = 3600, path: Optional[str] = None,
+                 max_stale: float = 7 * 24 * 3600):
+        """Bounded LRU cache of decoded API responses with per-endpoint TTLs.
+
+        Expired responses are kept until evicted, so they can still be
+        served with `get_stale` while the upstream cannot be reached.
+
+        Args:
+            max_entries (int): responses kept before the least recently used
+                one is evicted
+            ttls (dict): endpoint to TTL overrides for `default_ttls`
+            default_ttl (float): TTL for endpoints missing from the table
+            path (str): optional SQLite file that keeps the cache across
+                skill reloads
+            max_stale (float): seconds past expiry a response may be served
+                by `get_stale`
+        """
+        self.max_entries = max_entries
+        self.max_stale = max_stale
+        self.ttls = dict(self.default_ttls, **(ttls or {}))
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.stale_hits = 0
+        self._entries = OrderedDict()
+        self._requests = Counter()
+        self._lock = threading.RLock()
+        self._db = None
+        if path:
+            self._open_db(path)
+
+    @staticmethod
+    def make_key(endpoint: str, params: Optional[dict] = None) -> str:
+        """Build a cache key from an endpoint and its normalized params.
+
+        Args:
+            endpoint (str): API endpoint name
+            params (dict): query parameters
+
+        Returns:
+            str: key that is equal for equivalent queries
+
+        """
+        normalized = sorted(
+            (str(k), _WHITESPACE.sub(' ', str(v)).strip().lower())
+            for k, v in (params or {}).items())
+        return endpoint + '?' + urlencode(normalized)
+
+    @staticmethod
+    def split_key(key: str) -> Tuple[str, dict]:
+        """Get the endpoint and normalized params back from a cache key."""
+        endpoint, _, query = key.partition('?')
+        return endpoint, dict(parse_qsl(query))
+
+    def ttl_for(self, endpoint: str) -> float:
+        return self.ttls.get(endpoint, self.default_ttl)
+
+    def get(self, endpoint: str, params: Optional[dict] = None) -> Optional[dict]:
+        """Get a fresh cached response.
+
+        Args:
+            endpoint (str): API endpoint name
+            params (dict): query parameters
+
+        Returns:
+            dict: the cached response, None on a miss
+
+        """
+        if self.ttl_for(endpoint) <= 0:
+            return None
+        key = self.make_key(endpoint, params)
+        with self._lock:
+            self._requests[key] += 1
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires, value = entry
+            if expires <= time.time():
+                # kept for `get_stale` until replaced or evicted
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def get_stale(self, endpoint: str,
+                  params: Optional[dict] = None) -> Optional[dict]:
+        """Get a cached response even if it expired, within `max_stale`.
+
+        Args:
+            endpoint (str): API endpoint name
+            params (dict): query parameters
+
+        Returns:
+            dict: the cached response, None if there is none
+
+        """
+        with self._lock:
+            entry = self._entries.get(self.make_key(endpoint, params))
+            if entry is None or entry[0] + self.max_stale <= time.time():
+                return None
+            self.stale_hits += 1
+            return entry[1]
+
+    def contains(self, endpoint: str, params: Optional[dict] = None) -> bool:
+        """Check for a fresh response without touching counters or LRU order."""
+        with self._lock:
+            entry = self._entries.get(self.make_key(endpoint, params))
+            return entry is not None and entry[0] > time.time()
+
+    def popular(self, count: int = 10) -> List[Tuple[str, dict]]:
+        """Get the most requested queries, including those of past runs.
+
+        Args:
+            count (int): number of queries to return
+
+        Returns:
+            list: (endpoint, params) pairs, most requested first
+
+        """
+        with self._lock:
+            requests = Counter(self._requests)
+            if self._db:
+                requests.update(dict(self._db.execute(
+                    "SELECT key, count FROM popularity")))
+        return [self.split_key(key)
+                for key, _ in requests.most_common(count)]
+
+    def put(self, endpoint: str, params: Optional[dict], value: dict) -> None:
+        """Store a response, evicting the least recently used ones if full.
+
+        Args:
+            endpoint (str): API endpoint name
+            params (dict): query parameters
+            value (dict): the decoded response
+
+        Returns:
+            None
+
+        """
+        ttl = self.ttl_for(endpoint)
+        if ttl <= 0 or value is None:
+            return
+        key = self.make_key(endpoint, params)
+        expires = time.time() + ttl
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            self._persist(key, endpoint, expires, value)
+            while len(self._entries) > self.max_entries:
+                old_key, _ = self._entries.popitem(last=False)
+                self._unpersist(old_key)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop all entries, including the persisted ones."""
+        with self._lock:
+            self._entries.clear()
+            if self._db:
+                with self._db:
+                    self._db.execute("DELETE FROM responses")
+
+    def stats(self) -> dict:
+        """Get the cache counters.
+
+        Returns:
+            dict: size, capacity, hits, misses, evictions, expirations and
+                stale hits
+
+        """
+        with self._lock:
+            return {"size": len(self._entries),
+                    "max_entries": self.max_entries,
+                    "hits": self.hits,
+                    "misses": self.misses,
+                    "evictions": self.evictions,
+                    "expirations": self.expirations,
+                    "stale_hits": self.stale_hits}
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db:
+                self._flush_popularity()
+                self._db.close()
+                self._db = None
+
+    def _flush_popularity(self) -> None:
+        """Add the request counts of this run to the persisted ones."""
+        try:
+            with self._db:
+                self._db.executemany(
+                    "INSERT INTO popularity VALUES (?, ?) ON CONFLICT(key) "
+                    "DO UPDATE SET count = count + excluded.count",
+                    self._requests.items())
+                # only the head of the distribution matters for warm-up
+                self._db.execute(
+                    "DELETE FROM popularity WHERE key NOT IN (SELECT key "
+                    "FROM popularity ORDER BY count DESC LIMIT ?)",
+                    (self.max_entries,))
+            self._requests.clear()
+        except sqlite3.Error as e:
+            LOG.error(f"Could not persist query popularity: {e}")
+
+    def _open_db(self, path: str) -> None:
+        """Open the backing store and load the entries still servable."""
+        try:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            with self._db:
+                self._db.execute("CREATE TABLE IF NOT EXISTS responses "
+                                 "(key TEXT PRIMARY KEY, endpoint TEXT, "
+                                 "expires REAL, value TEXT)")
+                self._db.execute("CREATE TABLE IF NOT EXISTS popularity "
+                                 "(key TEXT PRIMARY KEY, count INTEGER)")
+                self._db.execute("DELETE FROM responses WHERE expires <= ?",
+                                 (time.time() - self.max_stale,))
+            rows = self._db.execute(
+                "SELECT key, expires, value FROM responses "
+                "ORDER BY expires DESC LIMIT ?", (self.max_entries,))
+            # oldest first, so the freshest entries end up most recently used
+            for key, expires, value in reversed(rows.fetchall()):
+                self._entries[key] = (expires, json.loads(value))
+        except (sqlite3.Error, ValueError) as e:
+            LOG.error(f"Could not load response cache from {path}: {e}")
+            self._db = None
+
+    def _persist(self, key: str, endpoint: str, expires: float,
+                 value: dict) -> None:
+        if not self._db:
+            return
+        try:
+            with self._db:
+                self._db.execute("INSERT OR REPLACE INTO responses "
+                                 "VALUES (?, ?, ?, ?)",
+                                 (key, endpoint, expires, json.dumps(value)))
+        except sqlite3.Error as e:
+            LOG.error(f"Could not persist cache entry {key}: {e}")
+
+    def _unpersist(self, key: str) -> None:
+        if not self._db:
+            return
+        try:
+            with self._db:
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+        except sqlite3.Error as e:
+            LOG.error(f"Could not delete cache entry {key}: {e}")
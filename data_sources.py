@@ -0,0 +1,377 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""Recipe backends searched in parallel.
+
+The in-memory sources (the local index, the response cache) are asked
+first, in the caller's thread. If none of them has an answer, the remote
+sources (TheMealDB and any mirror of it, such as a local mock server) are
+queried concurrently, each within its own deadline, and the first useful
+answer wins.
+"""
+
+import math
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import nullcontext
+from typing import Iterable, List, Optional
+
+from ovos_utils.log import LOG
+
+from .api_client import FILTER, LOOKUP, RANDOM, SEARCH, MealDBClient, \
+    background_requests, get_client, is_background, waits_for_tokens
+from .ingredient_search import combine_matches, search_by_ingredients
+from .metrics import get_metrics
+from .recipe_index import get_index
+from .title_index import get_titles
+
+
+def first_meal(data: Optional[dict]) -> Optional[dict]:
+    """Get the first meal from an API response, None if there is none."""
+    if data and data.get('meals'):
+        get_titles().add_meals(data['meals'])
+        return data['meals'][0]
+    return None
+
+
+class RecipeSource:
+    """A backend recipes can be searched in.
+
+    A query the source can't answer returns None (or an empty list), which
+    leaves it to the other sources.
+    """
+
+    name = 'source'
+    # in-memory sources answer in the caller's thread before any remote one
+    local = False
+
+    def __init__(self, deadline: Optional[float] = 5.0):
+        """
+        Args:
+            deadline (float): seconds a query may take before its answer is
+                no longer waited for, None to wait as long as it takes
+        """
+        self.deadline = deadline
+
+    def random(self) -> Optional[dict]:
+        """Get a random recipe."""
+        return None
+
+    def by_name(self, name: str) -> Optional[dict]:
+        """Get the recipe best matching a name."""
+        return None
+
+    def by_ingredients(self, ingredients: List[str]) -> List[str]:
+        """Get the ids of recipes using the ingredients, best matches first."""
+        return []
+
+    def lookup(self, meal_id: str) -> Optional[dict]:
+        """Get a recipe by its idMeal."""
+        return None
+
+
+class LocalIndexSource(RecipeSource):
+    """The recipes loaded from a local dump, see `LocalRecipeIndex`."""
+
+    name = 'local'
+    local = True
+
+    # no `random`: the few local recipes are the fallback for random ones,
+    # they would otherwise always win over TheMealDB's
+
+    def by_name(self, name: str) -> Optional[dict]:
+        index = get_index()
+        recipe = index.search_by_name(name)
+        if recipe:
+            return recipe
+        match = get_titles().best(name)
+        return index.get(match[0]) if match else None
+
+    def by_ingredients(self, ingredients: List[str]) -> List[str]:
+        results = []
+        for ingredient in ingredients:
+            meal_ids = get_index().match_ingredient(ingredient)
+            if not meal_ids:
+                # the remote sources combine local and upstream results
+                return []
+            results.append(meal_ids)
+        return combine_matches(results)
+
+    def lookup(self, meal_id: str) -> Optional[dict]:
+        return get_index().get(meal_id)
+
+
+class CacheSource(RecipeSource):
+    """Fresh responses in the shared client's cache, without any request."""
+
+    name = 'cache'
+    local = True
+
+    @staticmethod
+    def _get(endpoint: str, params: dict) -> Optional[dict]:
+        cache = get_client().cache
+        # `contains` leaves the miss to be counted by the client that fetches
+        if cache and cache.contains(endpoint, params):
+            return cache.get(endpoint, params)
+        return None
+
+    def by_name(self, name: str) -> Optional[dict]:
+        recipe = first_meal(self._get(SEARCH, {'s': name}))
+        if recipe:
+            return recipe
+        match = get_titles().best(name)
+        return self.lookup(match[0]) if match else None
+
+    def by_ingredients(self, ingredients: List[str]) -> List[str]:
+        results = []
+        for ingredient in ingredients:
+            meal_ids = get_index().match_ingredient(ingredient)
+            if not meal_ids:
+                data = self._get(FILTER, {'i': ingredient.replace(' ', '_')})
+                meal_ids = [meal['idMeal'] for meal in
+                            (data or {}).get('meals') or []
+                            if meal.get('idMeal')]
+            if not meal_ids:
+                return []
+            results.append(meal_ids)
+        return combine_matches(results)
+
+    def lookup(self, meal_id: str) -> Optional[dict]:
+        return first_meal(self._get(LOOKUP, {'i': meal_id}))
+
+
+class MealDBSource(RecipeSource):
+    """TheMealDB, or any server implementing its API."""
+
+    def __init__(self, client: Optional[MealDBClient] = None,
+                 name: str = 'themealdb', deadline: Optional[float] = 5.0):
+        """
+        Args:
+            client (MealDBClient): client of the server, the shared client
+                if None
+            name (str): label of the source in logs and metrics
+            deadline (float): seconds a query may take before its answer is
+                no longer waited for, None to wait as long as it takes
+        """
+        super().__init__(deadline)
+        self.name = name
+        self._client = client
+
+    @property
+    def client(self) -> MealDBClient:
+        return self._client or get_client()
+
+    def random(self) -> Optional[dict]:
+        return first_meal(self.client.get_json(RANDOM))
+
+    def by_name(self, name: str) -> Optional[dict]:
+        # misheard names ("lazagna") are corrected against all known titles,
+        # so only the best match is requested
+        match = get_titles().best(name)
+        if match:
+            meal_id, title = match
+            LOG.debug(f"Matched '{name}' to '{title}'")
+            return self.lookup(meal_id)
+        return first_meal(self.client.get_json(SEARCH, params={'s': name}))
+
+    def by_ingredients(self, ingredients: List[str]) -> List[str]:
+        return search_by_ingredients(ingredients, self.client)
+
+    def lookup(self, meal_id: str) -> Optional[dict]:
+        return first_meal(self.client.get_json(LOOKUP, params={'i': meal_id}))
+
+
+class MultiSource(RecipeSource):
+
+    name = 'sources'
+
+    def __init__(self, sources: Iterable[RecipeSource], max_workers: int = 16):
+        """Search several sources and return the first useful answer.
+
+        Local sources are asked in order. Remote ones are then queried in
+        parallel; a source that misses its deadline is no longer waited for,
+        and queries not started yet are cancelled once an answer is found.
+        A request already sent upstream can't be recalled, its response
+        still ends up in the client's cache.
+
+        Args:
+            sources (Iterable[RecipeSource]): the sources to search
+            max_workers (int): remote queries running at the same time
+        """
+        self.sources = list(sources)
+        deadlines = [source.deadline for source in self.sources]
+        super().__init__(None if None in deadlines else
+                         max(deadlines, default=0.0))
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix="recipe-source")
+
+    def first(self, query: str, *args):
+        """Ask every source the same query until one answers.
+
+        Args:
+            query (str): name of the `RecipeSource` method to call
+            *args: arguments of the query
+
+        Returns:
+            the first non-empty answer, None if no source had one
+
+        """
+        for source in self.sources:
+            if source.local:
+                result = self._ask(source, query, args)
+                if result:
+                    return result
+        remote = [source for source in self.sources if not source.local]
+        if not remote:
+            return None
+        metrics = get_metrics()
+        start = time.monotonic()
+        futures = {self._executor.submit(self._ask, source, query, args,
+                                         is_background(),
+                                         waits_for_tokens()): source
+                   for source in remote}
+        due = {future: math.inf if source.deadline is None
+               else start + source.deadline
+               for future, source in futures.items()}
+        pending = set(futures)
+        try:
+            while pending:
+                now = time.monotonic()
+                for future in [future for future in pending
+                               if due[future] <= now]:
+                    pending.discard(future)
+                    source = futures[future]
+                    LOG.warning(f"{source.name} did not answer {query} "
+                                f"within {source.deadline}s")
+                    metrics.inc("recipes_source_timeouts_total",
+                                source=source.name)
+                if not pending:
+                    break
+                timeout = min(due[future] for future in pending) - now
+                done, pending = wait(pending, timeout=None if timeout == math.inf
+                                     else timeout,
+                                     return_when=FIRST_COMPLETED)
+                for future in done:
+                    result = future.result()
+                    if result:
+                        metrics.inc("recipes_source_wins_total",
+                                    source=futures[future].name)
+                        return result
+            return None
+        finally:
+            for future in pending:
+                future.cancel()
+
+    @staticmethod
+    def _ask(source: RecipeSource, query: str, args: tuple,
+             background: bool = False, wait: bool = False):
+        """Run one query on one source, None if it failed."""
+        start = time.monotonic()
+        try:
+            # keep the caller's priority for the rate limiter
+            with background_requests(wait) if background else nullcontext():
+                return getattr(source, query)(*args)
+        except Exception as e:
+            LOG.error(f"{source.name} failed to answer {query}: {e}")
+            return None
+        finally:
+            get_metrics().observe("recipes_source_seconds",
+                                  time.monotonic() - start,
+                                  source=source.name, query=query)
+
+    def random(self) -> Optional[dict]:
+        return self.first('random')
+
+    def by_name(self, name: str) -> Optional[dict]:
+        return self.first('by_name', name)
+
+    def by_ingredients(self, ingredients: List[str]) -> List[str]:
+        return self.first('by_ingredients', ingredients) or []
+
+    def lookup(self, meal_id: str) -> Optional[dict]:
+        return self.first('lookup', meal_id)
+
+    def close(self) -> None:
+        """Stop the workers, dropping the queries not started yet."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def default_sources(mirrors: Iterable[MealDBClient] = (),
+                    deadline: Optional[float] = 5.0) -> List[RecipeSource]:
+    """Get the local index, the response cache, TheMealDB and its mirrors.
+
+    Args:
+        mirrors (Iterable[MealDBClient]): clients of other servers
+            implementing TheMealDB's API, queried alongside the shared client
+        deadline (float): seconds each remote source may take, None for
+            no limit
+
+    Returns:
+        list: the sources, in the order local ones are asked
+
+    """
+    return [LocalIndexSource(), CacheSource(),
+            MealDBSource(deadline=deadline)] + \
+        [MealDBSource(client, name=client.base_url, deadline=deadline)
+         for client in mirrors]
+
+
+_sources = None
+_sources_lock = threading.Lock()
+
+
+def get_sources() -> MultiSource:
+    """Get the module-level sources, creating the defaults on first use.
+
+    Returns:
+        MultiSource: the sources searched by `recipe_service`
+
+    """
+    global _sources
+    if _sources is None:
+        with _sources_lock:
+            if _sources is None:
+                _sources = MultiSource(default_sources())
+    return _sources
+
+
+def set_sources(sources: Optional[MultiSource]) -> None:
+    """Replace the module-level sources.
+
+    Args:
+        sources (MultiSource): the new shared sources, None to reset them
+
+    Returns:
+        None
+
+    """
+    global _sources
+    with _sources_lock:
+        if _sources is not None and _sources is not sources:
+            _sources.close()
+        _sources = sources
@@ -0,0 +1,148 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import re
+from difflib import get_close_matches
+from sys import getsizeof
+from typing import Dict, Iterable, Optional
+
+_WORD = re.compile(r'[a-z0-9]+')
+# ordered so that the longest matching suffix is tried first
+_PLURAL_SUFFIXES = (('ies', 'y'), ('oes', 'o'), ('ves', 'f'), ('ches', 'ch'),
+                    ('shes', 'sh'), ('sses', 'ss'), ('xes', 'x'), ('s', ''))
+_SINGULAR_ENDINGS = ('ss', 'us', 'is')
+# words of a query that name no ingredient ("the brown sugar")
+_FILLER = frozenset(('a', 'an', 'the', 'some', 'of'))
+_IRREGULAR = {'leaves': 'leaf', 'loaves': 'loaf', 'cloves': 'clove',
+              'olives': 'olive', 'chives': 'chive', 'knives': 'knife',
+              'anchovies': 'anchovy', 'cookies': 'cookie',
+              'veggies': 'veggie', 'couscous': 'couscous',
+              'molasses': 'molasses', 'hummus': 'hummus', 'asparagus':
+              'asparagus', 'swiss': 'swiss', 'oats': 'oat', 'peas': 'pea'}
+
+
+def singularize(word: str) -> str:
+    """Get the singular of a lowercase English noun, e.g. "tomatoes".
+
+    Args:
+        word (str): the word to singularize
+
+    Returns:
+        str: the singular, or the word unchanged if it does not look plural
+
+    """
+    if word in _IRREGULAR:
+        return _IRREGULAR[word]
+    if len(word) < 4 or word.endswith(_SINGULAR_ENDINGS):
+        return word
+    for suffix, replacement in _PLURAL_SUFFIXES:
+        if word.endswith(suffix):
+            return word[:-len(suffix)] + replacement
+    return word
+
+
+def normalize(name: Optional[str]) -> str:
+    """Lowercase and singularize an ingredient name, dropping punctuation."""
+    if not name:
+        return ''
+    return ' '.join(singularize(word) for word in _WORD.findall(name.lower()))
+
+
+class IngredientLookup:
+
+    __slots__ = ('_names', '_words')
+
+    def __init__(self, ingredients: Iterable[str]):
+        """Finds the ingredient of a recipe a user asks about.
+
+        Ingredient names are normalized once, so a lookup is a dict access;
+        a query of several words is matched against the words of the (at
+        most 20) names of the recipe, and only queries matching no name
+        fall back to fuzzy matching of each word over them.
+
+        Args:
+            ingredients (Iterable[str]): the ingredient names of the recipe
+        """
+        self._names: Dict[str, str] = {}
+        self._words: Dict[str, str] = {}
+        for ingredient in ingredients:
+            key = normalize(ingredient)
+            if key:
+                self._names.setdefault(key, ingredient)
+        # "flour" finds "plain flour" unless another ingredient is called
+        # just "flour"; the last word, usually the noun, matches first so
+        # "tomato" finds "chopped tomatoes" before "tomato puree"
+        for key, ingredient in self._names.items():
+            self._words.setdefault(key.rsplit(' ', 1)[-1], ingredient)
+        for key, ingredient in self._names.items():
+            for word in key.split():
+                self._words.setdefault(word, ingredient)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __sizeof__(self) -> int:
+        # the values are the recipe's own ingredient strings
+        return object.__sizeof__(self) + \
+            sum(getsizeof(index) + sum(getsizeof(key) for key in index)
+                for index in (self._names, self._words))
+
+    def find(self, query: Optional[str]) -> Optional[str]:
+        """Find an ingredient of the recipe.
+
+        Args:
+            query (str): the ingredient as said by the user, e.g. "eggs"
+
+        Returns:
+            str: the ingredient name as written in the recipe, None if the
+                recipe does not use it
+
+        """
+        words = [word for word in normalize(query).split()
+                 if word not in _FILLER]
+        if not words:
+            return None
+        key = ' '.join(words)
+        ingredient = self._names.get(key)
+        if ingredient:
+            return ingredient
+        if len(words) == 1:
+            ingredient = self._words.get(key)
+        else:
+            # every word must match: "olive oil" is not "vegetable oil"
+            ingredient = next((ingredient for name, ingredient
+                               in self._names.items()
+                               if set(words) <= set(name.split())), None)
+        if ingredient:
+            return ingredient
+        # a misheard word ("plain flower") must still be close to a word of
+        # the name, so "green pepper" does not answer for "red pepper"
+        return next((ingredient for name, ingredient in self._names.items()
+                     if all(get_close_matches(word, name.split(), n=1,
+                                              cutoff=0.7)
+                            for word in words)), None)
@@ -0,0 +1,135 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import re
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import List, Optional
+
+from .api_client import FILTER, MealDBClient, background_requests, \
+    get_client, is_background, waits_for_tokens
+from .recipe_index import get_index
+
+_SEPARATORS = re.compile(r'\s*(?:,|&|\band\b|\bplus\b)\s*', re.IGNORECASE)
+
+# blocking calls go through the pooled client, so the number of workers
+# bounds the number of concurrent upstream requests
+_executor = ThreadPoolExecutor(max_workers=8,
+                               thread_name_prefix="recipe-search")
+
+
+def split_ingredients(text: Optional[str]) -> List[str]:
+    """Split an utterance like "chicken, rice and peas" into ingredients.
+
+    Args:
+        text (str): the ingredient slot of the utterance
+
+    Returns:
+        list: distinct ingredients in the order they were spoken
+
+    """
+    ingredients = []
+    for ingredient in _SEPARATORS.split(text or ''):
+        ingredient = ingredient.strip().lower()
+        if ingredient and ingredient not in ingredients:
+            ingredients.append(ingredient)
+    return ingredients
+
+
+def filter_by_ingredient(ingredient: str,
+                         client: Optional[MealDBClient] = None) -> List[str]:
+    """Get the ids of recipes using an ingredient.
+
+    The local index is searched first, TheMealDB is only called on a miss.
+
+    Args:
+        ingredient (str): a single ingredient
+        client (MealDBClient): the API to call, the shared client if None
+
+    Returns:
+        list: idMeal values in the order the source returned them
+
+    """
+    meal_ids = get_index().match_ingredient(ingredient)
+    if meal_ids:
+        return meal_ids
+    data = (client or get_client()).get_json(
+        FILTER, params={'i': ingredient.replace(' ', '_')})
+    return [meal['idMeal'] for meal in (data or {}).get('meals') or []
+            if meal.get('idMeal')]
+
+
+def combine_matches(results: List[List[str]]) -> List[str]:
+    """Rank the ids found for each ingredient by how many lists contain them.
+
+    Recipes that use more of the requested ingredients come first, so the
+    intersection of all result sets leads the list. Ties keep the order in
+    which the sources returned them.
+
+    Args:
+        results (list): idMeal lists, one per ingredient
+
+    Returns:
+        list: ranked idMeal values
+
+    """
+    matches = {}
+    for meal_ids in results:
+        for meal_id in meal_ids:
+            matches[meal_id] = matches.get(meal_id, 0) + 1
+    # dicts keep insertion order and sorted() is stable
+    return sorted(matches, key=lambda meal_id: -matches[meal_id])
+
+
+def search_by_ingredients(ingredients: List[str],
+                          client: Optional[MealDBClient] = None) -> List[str]:
+    """Search all ingredients concurrently and rank the combined results.
+
+    A single ingredient is searched in the calling thread. Several are
+    searched in worker threads, which keep the caller's rate limiter
+    priority (see `background_requests`).
+
+    Args:
+        ingredients (list): ingredients to search for
+        client (MealDBClient): the API to call, the shared client if None
+
+    Returns:
+        list: ranked idMeal values, see `combine_matches`
+
+    """
+    if len(ingredients) < 2:
+        return combine_matches([filter_by_ingredient(ingredient, client)
+                                for ingredient in ingredients])
+    background = is_background()
+    wait = waits_for_tokens()
+
+    def search(ingredient: str) -> List[str]:
+        with background_requests(wait) if background else nullcontext():
+            return filter_by_ingredient(ingredient, client)
+
+    return combine_matches(list(_executor.map(search, ingredients)))
@@ -0,0 +1,249 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+from functools import wraps
+from threading import Lock
+from time import perf_counter
+from typing import Callable, Dict, Tuple
+
+# histogram bucket upper bounds, in seconds
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+           10.0)
+
+
+class _Timer:
+
+    __slots__ = ('metrics', 'name', 'labels', 'start')
+
+    def __init__(self, metrics: 'Metrics', name: str, labels: dict):
+        self.metrics = metrics
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        self.metrics.observe(self.name, perf_counter() - self.start,
+                             **self.labels)
+
+
+class _NullTimer:
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class Metrics:
+
+    def __init__(self, enabled: bool = False):
+        """Latency histograms, counters and gauges for the skill.
+
+        Every recording method returns immediately while disabled, so
+        instrumented code pays a single attribute check.
+
+        Args:
+            enabled (bool): record values
+        """
+        self.enabled = enabled
+        self._histograms = {}
+        self._counters = {}
+        self._gauges = {}
+        self._lock = Lock()
+
+    @staticmethod
+    def _key(name: str, labels: dict) -> Tuple[str, tuple]:
+        return name, tuple(sorted(labels.items()))
+
+    def observe(self, name: str, seconds: float, **labels) -> None:
+        """Add a duration to a histogram.
+
+        Args:
+            name (str): metric name
+            seconds (float): observed duration
+            labels: label names and values of the series
+
+        Returns:
+            None
+
+        """
+        if self.enabled:
+            self.observe_series(self._key(name, labels), seconds)
+
+    def observe_series(self, key: Tuple[str, tuple], seconds: float) -> None:
+        """Add a duration to a histogram identified by a prebuilt key."""
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                # bucket counts, then sum and count
+                histogram = self._histograms[key] = [0] * len(BUCKETS) + [0.0, 0]
+            for i, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    histogram[i] += 1
+                    break
+            histogram[-2] += seconds
+            histogram[-1] += 1
+
+    def inc(self, name: str, amount: int = 1, **labels) -> None:
+        """Increment a counter."""
+        if not self.enabled:
+            return
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def set_gauge(self, name: str, value: float, **labels) -> None:
+        """Set a gauge to its current value."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._gauges[self._key(name, labels)] = value
+
+    def timer(self, name: str, **labels):
+        """Get a context manager observing the duration of its block."""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, name, labels)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+            self._gauges.clear()
+
+    def snapshot(self) -> Dict[str, list]:
+        """Get all series in a JSON-serializable form.
+
+        Returns:
+            dict: "histograms", "counters" and "gauges", each a list of
+                series with their name, labels and values
+
+        """
+        with self._lock:
+            histograms = [{"name": name, "labels": dict(labels),
+                           "buckets": dict(zip(BUCKETS, values[:-2])),
+                           "sum": values[-2], "count": values[-1]}
+                          for (name, labels), values
+                          in self._histograms.items()]
+            counters = [{"name": name, "labels": dict(labels),
+                         "value": value}
+                        for (name, labels), value in self._counters.items()]
+            gauges = [{"name": name, "labels": dict(labels), "value": value}
+                      for (name, labels), value in self._gauges.items()]
+        return {"histograms": histograms, "counters": counters,
+                "gauges": gauges}
+
+    def to_prometheus(self) -> str:
+        """Render all series in the Prometheus text exposition format.
+
+        Returns:
+            str: the exposition text
+
+        """
+        lines = []
+        snapshot = self.snapshot()
+        for kind, series in (("histogram", snapshot["histograms"]),
+                             ("counter", snapshot["counters"]),
+                             ("gauge", snapshot["gauges"])):
+            for name in sorted({s["name"] for s in series}):
+                lines.append(f"# TYPE {name} {kind}")
+                for s in series:
+                    if s["name"] != name:
+                        continue
+                    if kind != "histogram":
+                        lines.append(f"{name}{_labels(s['labels'])} "
+                                     f"{s['value']}")
+                        continue
+                    cumulative = 0
+                    for bound, count in s["buckets"].items():
+                        cumulative += count
+                        lines.append(f"{name}_bucket"
+                                     f"{_labels(s['labels'], le=bound)} "
+                                     f"{cumulative}")
+                    lines.append(f"{name}_bucket"
+                                 f"{_labels(s['labels'], le='+Inf')} "
+                                 f"{s['count']}")
+                    lines.append(f"{name}_sum{_labels(s['labels'])} "
+                                 f"{s['sum']}")
+                    lines.append(f"{name}_count{_labels(s['labels'])} "
+                                 f"{s['count']}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+
+def _labels(labels: dict, **extra) -> str:
+    labels = dict(labels, **extra)
+    if not labels:
+        return ""
+    pairs = ",".join('{}="{}"'.format(
+        key, str(value).replace('\\', '\\\\').replace('"', '\\"'))
+        for key, value in sorted(labels.items()))
+    return "{" + pairs + "}"
+
+
+_metrics = Metrics()
+
+
+def get_metrics() -> Metrics:
+    """Get the module-level metrics registry."""
+    return _metrics
+
+
+def instrumented(name: str, **labels) -> Callable:
+    """Decorate a function to observe its duration in a histogram.
+
+    The function name is added as the "function" label.
+
+    Args:
+        name (str): histogram name
+        labels: extra label names and values
+
+    Returns:
+        Callable: the decorator
+
+    """
+    def decorator(func: Callable) -> Callable:
+        key = Metrics._key(name, dict(labels, function=func.__name__))
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _metrics.enabled:
+                return func(*args, **kwargs)
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _metrics.observe_series(key, perf_counter() - start)
+        return wrapper
+    return decorator
@@ -0,0 +1,176 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from time import monotonic
+from typing import Callable, Iterable, Optional
+
+from ovos_utils.log import LOG
+
+from .api_client import background_requests
+
+
+class RequestBudget:
+
+    def __init__(self, requests_per_minute: int = 30):
+        """Sliding one-minute window limiting background requests.
+
+        Args:
+            requests_per_minute (int): requests allowed in any 60 seconds
+        """
+        self.requests_per_minute = requests_per_minute
+        self._sent = deque()
+        self._lock = Lock()
+
+    def try_acquire(self) -> bool:
+        """Take one request from the budget.
+
+        Returns:
+            bool: False if the budget for the current minute is spent
+
+        """
+        now = monotonic()
+        with self._lock:
+            while self._sent and now - self._sent[0] >= 60:
+                self._sent.popleft()
+            if len(self._sent) >= self.requests_per_minute:
+                return False
+            self._sent.append(now)
+            return True
+
+
+class Prefetcher:
+
+    def __init__(self, budget: Optional[RequestBudget] = None,
+                 queue_size: int = 3, max_users: int = 256):
+        """Fetches likely-next recipes in the background.
+
+        Prefetched recipes wait in a small per-user queue; fetches that only
+        warm the response cache can be scheduled with `warm`. Every fetch
+        takes one request from `budget` and stops when it is spent, and its
+        API calls yield to interactive ones at the client's rate limiter.
+
+        Args:
+            budget (RequestBudget): limit on background requests
+            queue_size (int): recipes kept ready per user
+            max_users (int): users with a queue before the oldest is dropped
+        """
+        self.budget = budget or RequestBudget()
+        self.queue_size = queue_size
+        self.max_users = max_users
+        self._queues = OrderedDict()
+        self._filling = set()
+        self._lock = Lock()
+        # a single worker keeps background traffic serial
+        self._executor = ThreadPoolExecutor(max_workers=1,
+                                            thread_name_prefix="recipe-prefetch")
+
+    def pop(self, user: str) -> Optional[dict]:
+        """Get a prefetched recipe for a user.
+
+        Args:
+            user (str): the user asking for another recipe
+
+        Returns:
+            dict: recipe data, None if the queue is empty
+
+        """
+        with self._lock:
+            queue = self._queues.get(user)
+            return queue.popleft() if queue else None
+
+    def fill(self, user: str, fetch: Callable[[], Optional[dict]]) -> None:
+        """Top up a user's queue in the background.
+
+        Args:
+            user (str): the user to prefetch for
+            fetch (Callable): returns one recipe per call, None on failure
+
+        Returns:
+            None
+
+        """
+        with self._lock:
+            if user in self._filling:
+                return
+            self._filling.add(user)
+        self._executor.submit(self._fill, user, fetch)
+
+    def warm(self, fetches: Iterable[Callable]) -> None:
+        """Run fetches in the background to warm the caches they go through.
+
+        Args:
+            fetches (Iterable[Callable]): calls to run, results are dropped
+
+        Returns:
+            None
+
+        """
+        self._executor.submit(self._warm, list(fetches))
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _fill(self, user: str, fetch: Callable[[], Optional[dict]]) -> None:
+        try:
+            while self._missing(user) and self.budget.try_acquire():
+                with background_requests():
+                    recipe_data = fetch()
+                if not recipe_data:
+                    break
+                with self._lock:
+                    queue = self._queues.pop(user, None) or \
+                        deque(maxlen=self.queue_size)
+                    queue.append(recipe_data)
+                    self._queues[user] = queue
+                    if len(self._queues) > self.max_users:
+                        self._queues.popitem(last=False)
+        except Exception as e:
+            LOG.error(f"Prefetching for {user} failed: {e}")
+        finally:
+            with self._lock:
+                self._filling.discard(user)
+
+    def _missing(self, user: str) -> bool:
+        with self._lock:
+            return len(self._queues.get(user, ())) < self.queue_size
+
+    def _warm(self, fetches: list) -> None:
+        for done, fetch in enumerate(fetches):
+            if not self.budget.try_acquire():
+                LOG.debug(f"Prefetch budget spent, skipping "
+                          f"{len(fetches) - done} fetches")
+                return
+            try:
+                # nothing retries a dropped warm-up, so it waits its turn
+                with background_requests(wait=True):
+                    fetch()
+            except Exception as e:
+                LOG.error(f"Warm-up fetch failed: {e}")
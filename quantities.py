@@ -0,0 +1,304 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import re
+from functools import lru_cache
+from typing import NamedTuple, Optional, Pattern
+
+# canonical unit: (aliases, dimension, size in the dimension's base unit,
+# spoken singular, spoken plural); volumes are in ml and masses in g
+UNITS = {
+    'ml': (('ml', 'milliliter', 'milliliters', 'millilitre', 'millilitres'),
+           'volume', 1.0, 'milliliter', 'milliliters'),
+    'cl': (('cl', 'centiliter', 'centiliters', 'centilitre', 'centilitres'),
+           'volume', 10.0, 'centiliter', 'centiliters'),
+    'dl': (('dl', 'deciliter', 'deciliters', 'decilitre', 'decilitres'),
+           'volume', 100.0, 'deciliter', 'deciliters'),
+    'l': (('l', 'liter', 'liters', 'litre', 'litres'),
+          'volume', 1000.0, 'liter', 'liters'),
+    'tsp': (('tsp', 'tsps', 'teaspoon', 'teaspoons', 't'),
+            'volume', 4.92892, 'teaspoon', 'teaspoons'),
+    'tbsp': (('tbsp', 'tbsps', 'tbs', 'tbls', 'tblsp', 'tbl', 'tablespoon',
+              'tablespoons', 'T'),
+             'volume', 14.7868, 'tablespoon', 'tablespoons'),
+    'fl oz': (('fl oz', 'fl. oz', 'fluid ounce', 'fluid ounces'),
+              'volume', 29.5735, 'fluid ounce', 'fluid ounces'),
+    'cup': (('cup', 'cups', 'c'), 'volume', 236.588, 'cup', 'cups'),
+    'pint': (('pint', 'pints', 'pt'), 'volume', 473.176, 'pint', 'pints'),
+    'quart': (('quart', 'quarts', 'qt'), 'volume', 946.353, 'quart',
+              'quarts'),
+    'gallon': (('gallon', 'gallons', 'gal'), 'volume', 3785.41, 'gallon',
+               'gallons'),
+    'mg': (('mg', 'milligram', 'milligrams', 'milligramme', 'milligrammes'),
+           'mass', 0.001, 'milligram', 'milligrams'),
+    'g': (('g', 'gr', 'gram', 'grams', 'gramme', 'grammes'),
+          'mass', 1.0, 'gram', 'grams'),
+    'kg': (('kg', 'kilo', 'kilos', 'kilogram', 'kilograms', 'kilogramme',
+            'kilogrammes'), 'mass', 1000.0, 'kilogram', 'kilograms'),
+    'oz': (('oz', 'ounce', 'ounces'), 'mass', 28.3495, 'ounce', 'ounces'),
+    'lb': (('lb', 'lbs', 'pound', 'pounds'), 'mass', 453.592, 'pound',
+           'pounds'),
+    'clove': (('clove', 'cloves'), 'count', 1.0, 'clove', 'cloves'),
+    'pinch': (('pinch', 'pinches'), 'count', 1.0, 'pinch', 'pinches'),
+    'dash': (('dash', 'dashes'), 'count', 1.0, 'dash', 'dashes'),
+    'can': (('can', 'cans', 'tin', 'tins'), 'count', 1.0, 'can', 'cans'),
+    'slice': (('slice', 'slices'), 'count', 1.0, 'slice', 'slices'),
+    'stick': (('stick', 'sticks'), 'count', 1.0, 'stick', 'sticks'),
+    'sprig': (('sprig', 'sprigs'), 'count', 1.0, 'sprig', 'sprigs'),
+    'handful': (('handful', 'handfuls'), 'count', 1.0, 'handful',
+                'handfuls'),
+    'bunch': (('bunch', 'bunches'), 'count', 1.0, 'bunch', 'bunches'),
+    'leaf': (('leaf', 'leaves'), 'count', 1.0, 'leaf', 'leaves'),
+}
+
+# the units each system converts to, largest first; spoons are used in both
+SYSTEMS = {
+    'metric': {'volume': ('l', 'ml'), 'mass': ('kg', 'g')},
+    'imperial': {'volume': ('cup', 'tbsp', 'tsp'), 'mass': ('lb', 'oz')},
+}
+
+_SPOONS = ('tsp', 'tbsp')
+_VULGAR_FRACTIONS = {'½': 0.5, '⅓': 1 / 3, '⅔': 2 / 3, '¼': 0.25, '¾': 0.75,
+                     '⅛': 0.125, '⅜': 0.375, '⅝': 0.625, '⅞': 0.875}
+_SPOKEN_FRACTIONS = ((0.25, 'a quarter'), (1 / 3, 'a third'),
+                     (0.5, 'a half'), (2 / 3, 'two thirds'),
+                     (0.75, 'three quarters'))
+
+# case-sensitive aliases ("T" is a tablespoon, "t" a teaspoon) are matched
+# as written, all others ignoring case
+_ALIASES = {}
+for _unit, (_aliases, *_) in UNITS.items():
+    for _alias in _aliases:
+        _ALIASES[_alias if _alias in ('t', 'T') else _alias.lower()] = _unit
+
+# "1,000" has a thousands separator, "1,5" a decimal comma
+_NUMBER = (r'(?:\d+\s+\d+/\d+|\d+\s*[{0}]|\d+/\d+|\d{{1,3}}(?:,\d{{3}})+(?!\d)|'
+           r'\d+(?:[.,]\d+)?|[{0}])').format(
+    ''.join(_VULGAR_FRACTIONS))
+
+
+@lru_cache(maxsize=None)
+def _quantity_pattern() -> Pattern:
+    """Compile the measure pattern on first use, keeping it out of import."""
+    return re.compile(
+        r'^\s*(?P<amount>{0})(?:\s*(?:-|–|to)\s*(?P<amount_max>{0}))?\s*'
+        r'(?:(?P<unit>{1})(?![a-zA-Z])\.?)?\s*(?P<note>.*?)\s*$'.format(
+            _NUMBER, '|'.join(re.escape(alias) for alias in
+                              sorted(_ALIASES, key=len, reverse=True))),
+        re.IGNORECASE)
+
+
+class Quantity(NamedTuple):
+    """A parsed measure such as "1 1/2 cups, sifted"."""
+    amount: Optional[float]
+    unit: Optional[str]
+    note: str = ''
+    amount_max: Optional[float] = None
+
+
+def _to_number(text: str) -> Optional[float]:
+    text = text.strip()
+    if text[-1] in _VULGAR_FRACTIONS:
+        whole = text[:-1].strip()
+        return (float(whole) if whole else 0.0) + _VULGAR_FRACTIONS[text[-1]]
+    if '/' in text:
+        whole, _, fraction = text.rpartition(' ')
+        numerator, denominator = fraction.split('/')
+        if not float(denominator):
+            # "1/0" is a typo, not an amount
+            return None
+        value = float(numerator) / float(denominator)
+        return value + (float(whole) if whole else 0.0)
+    if ',' in text:
+        head, *groups = text.split(',')
+        if all(len(group) == 3 for group in groups):
+            return float(head + ''.join(groups))
+        return float(text.replace(',', '.'))
+    return float(text)
+
+
+def parse_quantity(measure: Optional[str]) -> Quantity:
+    """Parse a strMeasureN value.
+
+    Args:
+        measure (str): e.g. "1 1/2 cups", "500g", "2 cloves chopped", "pinch"
+
+    Returns:
+        Quantity: the amount (None if there is no number), the canonical
+            unit (None if there is none) and the rest of the text as note
+
+    """
+    if not measure or not measure.strip():
+        return Quantity(None, None, '')
+    match = _quantity_pattern().match(measure)
+    if not match:
+        # no leading number, but the text may still name a unit ("pinch")
+        unit = _ALIASES.get(measure.strip().lower())
+        if unit and UNITS[unit][1] == 'count':
+            return Quantity(1.0, unit, '')
+        return Quantity(None, None, measure.strip())
+    unit = match.group('unit')
+    if unit:
+        unit = _ALIASES.get(unit) or _ALIASES.get(unit.lower())
+    amount = _to_number(match.group('amount'))
+    if amount is None:
+        return Quantity(None, None, measure.strip())
+    amount_max = match.group('amount_max')
+    return Quantity(amount, unit, match.group('note'),
+                    _to_number(amount_max) if amount_max else None)
+
+
+def scale(quantity: Quantity, factor: float) -> Quantity:
+    """Scale a quantity, e.g. for a different number of servings."""
+    if quantity.amount is None:
+        return quantity
+    return quantity._replace(
+        amount=quantity.amount * factor,
+        amount_max=quantity.amount_max * factor
+        if quantity.amount_max is not None else None)
+
+
+def convert(quantity: Quantity, system: str) -> Quantity:
+    """Convert a quantity to the "metric" or "imperial" system.
+
+    The largest unit of the system that keeps the amount at or above one is
+    used. Counts and quantities without a unit are returned unchanged.
+
+    Args:
+        quantity (Quantity): the quantity to convert
+        system (str): "metric" or "imperial"
+
+    Returns:
+        Quantity: the converted quantity
+
+    """
+    if quantity.amount is None or quantity.unit is None:
+        return quantity
+    _, dimension, size, _, _ = UNITS[quantity.unit]
+    targets = SYSTEMS.get(system, {}).get(dimension)
+    if not targets or quantity.unit in targets or quantity.unit in _SPOONS:
+        return quantity
+    base = quantity.amount * size
+    for target in targets:
+        if base / UNITS[target][2] >= 1:
+            break
+    target_size = UNITS[target][2]
+    return quantity._replace(
+        amount=base / target_size, unit=target,
+        amount_max=quantity.amount_max * size / target_size
+        if quantity.amount_max is not None else None)
+
+
+def format_amount(amount: float) -> str:
+    """Say an amount the way a cook would, e.g. "1 and a half"."""
+    whole = int(amount)
+    if whole >= 10:
+        return str(round(amount))
+    fraction = amount - whole
+    for value, words in _SPOKEN_FRACTIONS:
+        if abs(fraction - value) < 0.02:
+            return f'{whole} and {words}' if whole else words
+    if fraction < 0.05 or fraction > 0.95:
+        return str(round(amount))
+    return f'{amount:.1f}'
+
+
+def to_spoken(quantity: Quantity) -> Optional[str]:
+    """Render a quantity for TTS, e.g. "1 and a half cups, sifted".
+
+    Args:
+        quantity (Quantity): the quantity to render
+
+    Returns:
+        str: the spoken quantity, None if there is nothing to say
+
+    """
+    if quantity.amount is None:
+        return quantity.note or None
+    words = [format_amount(quantity.amount)]
+    if quantity.amount_max is not None:
+        words.append('to ' + format_amount(quantity.amount_max))
+    if quantity.unit:
+        _, _, _, singular, plural = UNITS[quantity.unit]
+        amount = quantity.amount_max or quantity.amount
+        if amount < 1 and words == ['a half']:
+            words = ['half a']
+        elif amount < 1:
+            # "a quarter of a cup" rather than "a quarter cup"
+            words.append('of a')
+        words.append(singular if amount <= 1 else plural)
+    if quantity.note:
+        words.append(quantity.note)
+    return ' '.join(words)
+
+
+def adjust(quantity: Quantity, system: Optional[str] = None,
+           factor: float = 1.0) -> Quantity:
+    """Scale a quantity for a number of servings, then convert its unit.
+
+    Args:
+        quantity (Quantity): the parsed measure
+        system (str): "metric" or "imperial" to convert to, None to keep
+            the recipe's units
+        factor (float): servings relative to the recipe's, e.g. 2 for twice
+            as many
+
+    Returns:
+        Quantity: the quantity to say
+
+    """
+    if factor != 1:
+        quantity = scale(quantity, factor)
+    return convert(quantity, system) if system else quantity
+
+
+def describe(ingredient: str, quantity: Quantity,
+             system: Optional[str] = None) -> str:
+    """Say how much of an ingredient is needed.
+
+    Args:
+        ingredient (str): the ingredient name
+        quantity (Quantity): the parsed measure of the ingredient
+        system (str): "metric" or "imperial" to convert to, None to keep
+            the recipe's units
+
+    Returns:
+        str: e.g. "2 cups of flour", "3 free-range eggs" or "salt, to taste"
+
+    """
+    if system:
+        quantity = convert(quantity, system)
+    if quantity.amount is None:
+        return f'{ingredient}, {quantity.note.lower()}' if quantity.note \
+            else ingredient
+    if quantity.unit is None:
+        return f'{to_spoken(quantity)} {ingredient}'
+    spoken = to_spoken(quantity._replace(note=''))
+    if quantity.note:
+        return f'{spoken} of {ingredient}, {quantity.note.lower()}'
+    return f'{spoken} of {ingredient}'
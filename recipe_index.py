@@ -0,0 +1,325 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import json
+import random
+import re
+import threading
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Optional, Union
+
+from ovos_utils.log import LOG
+
+from .recipe_utils import Recipe
+
+if TYPE_CHECKING:
+    from .snapshot import Snapshot
+
+_TOKEN = re.compile(r'[a-z0-9]+')
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Split text into lowercase alphanumeric tokens."""
+    return _TOKEN.findall(text.lower()) if text else []
+
+
+def recipe_ingredients(recipe: dict) -> List[str]:
+    """Get the non-empty strIngredientN values of a raw recipe dict."""
+    ingredients = []
+    for i in range(1, 21):
+        ingredient = recipe.get('strIngredient' + str(i))
+        if not ingredient or not ingredient.strip():
+            break
+        ingredients.append(ingredient.strip())
+    return ingredients
+
+
+class LocalRecipeIndex:
+
+    indexed_fields = ('strMeal', 'strCategory', 'strArea')
+
+    def __init__(self, recipes: Optional[Iterable[dict]] = None):
+        """In-process recipe store with inverted indexes for offline search.
+
+        Recipes loaded from a snapshot stay in the mapped file, only their
+        tokens are kept; they are built as `Recipe`s when a search returns
+        them, other recipes are returned as the dicts they were added as.
+
+        Args:
+            recipes (Iterable[dict]): TheMealDB-format recipes to add
+        """
+        self.recipes = {}
+        self._stored = {}
+        self._snapshots = []
+        self._names = {}
+        self._titles = {}
+        self._tokens = {}
+        self._ingredient_tokens = {}
+        self._lock = threading.RLock()
+        if recipes:
+            self.add_all(recipes)
+
+    def __len__(self) -> int:
+        return len(self.recipes) + len(self._stored)
+
+    def __contains__(self, meal_id: str) -> bool:
+        return meal_id in self.recipes or meal_id in self._stored
+
+    def load(self, path: str) -> int:
+        """Bulk-load a TheMealDB JSON dump or a recipe snapshot.
+
+        The dump may be an API response (`{"meals": [...]}`) or a plain list
+        of recipes. A snapshot is kept open until `close`.
+
+        Args:
+            path (str): path to the JSON or snapshot file
+
+        Returns:
+            int: number of recipes added
+
+        """
+        from .snapshot import Snapshot, is_snapshot
+        if is_snapshot(path):
+            count = self.add_snapshot(Snapshot(path))
+        else:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                data = data.get('meals') or []
+            count = self.add_all(data)
+        LOG.info(f"Loaded {count} recipes from {path}")
+        return count
+
+    def add_all(self, recipes: Iterable[dict]) -> int:
+        count = 0
+        with self._lock:
+            for recipe in recipes:
+                if self.add(recipe):
+                    count += 1
+        return count
+
+    def add_snapshot(self, snapshot: 'Snapshot') -> int:
+        """Index the recipes of a snapshot, which then backs them.
+
+        Args:
+            snapshot (Snapshot): an open snapshot, closed by `close`
+
+        Returns:
+            int: number of recipes added
+
+        """
+        with self._lock:
+            self._snapshots.append(snapshot)
+            for meal_id in snapshot:
+                if meal_id in self:
+                    self._remove(meal_id)
+                self._stored[meal_id] = snapshot
+                self._index(meal_id, snapshot.summary(meal_id))
+        return len(snapshot)
+
+    def add(self, recipe: dict) -> bool:
+        """Add a single recipe to the index.
+
+        Args:
+            recipe (dict): TheMealDB-format recipe
+
+        Returns:
+            bool: False if the recipe has no id and was skipped
+
+        """
+        meal_id = recipe.get('idMeal')
+        if not meal_id:
+            return False
+        with self._lock:
+            if meal_id in self:
+                self._remove(meal_id)
+            self.recipes[meal_id] = recipe
+            self._index(meal_id, recipe)
+        return True
+
+    def get(self, meal_id: str) -> Union[dict, Recipe, None]:
+        """Get a recipe by its idMeal.
+
+        Args:
+            meal_id (str): TheMealDB recipe id
+
+        Returns:
+            dict: the recipe as added, a `Recipe` if a snapshot backs it,
+                None if the index does not have it
+
+        """
+        recipe = self.recipes.get(meal_id)
+        if recipe is not None:
+            return recipe
+        snapshot = self._stored.get(meal_id)
+        return snapshot.recipe(meal_id) if snapshot else None
+
+    def meals(self) -> Iterator[dict]:
+        """Iterate over the indexed fields of every recipe.
+
+        Snapshot recipes are not built, e.g. for `TitleIndex.add_meals`.
+        """
+        with self._lock:
+            recipes = list(self.recipes.values())
+            stored = list(self._stored.items())
+        yield from recipes
+        for meal_id, snapshot in stored:
+            yield snapshot.summary(meal_id)
+
+    def random(self) -> Union[dict, Recipe, None]:
+        with self._lock:
+            meal_ids = list(self.recipes) + list(self._stored)
+            if not meal_ids:
+                return None
+            return self.get(random.choice(meal_ids))
+
+    def search_by_name(self, name: str) -> Union[dict, Recipe, None]:
+        """Find the recipe best matching a name.
+
+        An exact (normalized) title match wins; otherwise recipes containing
+        every query token in any indexed field are ranked by how many of the
+        tokens appear in their title.
+
+        Args:
+            name (str): the requested recipe name
+
+        Returns:
+            dict: the best matching recipe (see `get`), None on a local miss
+
+        """
+        tokens = tokenize(name)
+        if not tokens:
+            return None
+        with self._lock:
+            meal_id = self._names.get(' '.join(tokens))
+            if meal_id:
+                return self.get(meal_id)
+            candidates = self._match(self._tokens, tokens)
+            if not candidates:
+                return None
+            tokens = set(tokens)
+            best = max(sorted(candidates),
+                       key=lambda i: len(tokens & self._titles[i]))
+            return self.get(best)
+
+    def search_by_ingredient(self, ingredient: str) -> List[Union[dict, Recipe]]:
+        """Find recipes using an ingredient.
+
+        Args:
+            ingredient (str): the ingredient, e.g. "chicken breast"
+
+        Returns:
+            list: recipes (see `get`) that list every token of the
+                ingredient, sorted by id
+
+        """
+        with self._lock:
+            return [self.get(i) for i in self.match_ingredient(ingredient)]
+
+    def match_ingredient(self, ingredient: str) -> List[str]:
+        """Find the ids of recipes using an ingredient, without building them.
+
+        Args:
+            ingredient (str): the ingredient, e.g. "chicken breast"
+
+        Returns:
+            list: idMeal values of the recipes that list every token of the
+                ingredient, sorted
+        """
+        with self._lock:
+            return sorted(self._match(self._ingredient_tokens,
+                                      tokenize(ingredient)))
+
+    def close(self) -> None:
+        """Drop the snapshot recipes and close their snapshots."""
+        with self._lock:
+            for meal_id in list(self._stored):
+                self._remove(meal_id)
+            for snapshot in self._snapshots:
+                snapshot.close()
+            self._snapshots = []
+
+    @staticmethod
+    def _match(index: dict, tokens: List[str]) -> set:
+        """Get the ids listed under every token, smallest posting list first."""
+        postings = sorted((index.get(token, set()) for token in set(tokens)),
+                          key=len)
+        if not postings:
+            return set()
+        return set(postings[0]).intersection(*postings[1:])
+
+    def _index(self, meal_id: str, recipe: dict) -> None:
+        title = tokenize(recipe.get('strMeal'))
+        self._names[' '.join(title)] = meal_id
+        self._titles[meal_id] = frozenset(title)
+        tokens, ingredient_tokens = self._recipe_tokens(recipe)
+        for token in tokens:
+            self._tokens.setdefault(token, set()).add(meal_id)
+        for token in ingredient_tokens:
+            self._ingredient_tokens.setdefault(token, set()).add(meal_id)
+
+    @classmethod
+    def _recipe_tokens(cls, recipe: dict) -> tuple:
+        """Get all indexed tokens of a recipe and its ingredient tokens."""
+        ingredient_tokens = set()
+        for ingredient in recipe_ingredients(recipe):
+            ingredient_tokens.update(tokenize(ingredient))
+        tokens = set(ingredient_tokens)
+        for field in cls.indexed_fields:
+            tokens.update(tokenize(recipe.get(field)))
+        return tokens, ingredient_tokens
+
+    def _remove(self, meal_id: str) -> None:
+        recipe = self.recipes.pop(meal_id, None)
+        if recipe is None:
+            recipe = self._stored.pop(meal_id).summary(meal_id)
+        self._titles.pop(meal_id, None)
+        name = ' '.join(tokenize(recipe.get('strMeal')))
+        if self._names.get(name) == meal_id:
+            del self._names[name]
+        for index, tokens in zip((self._tokens, self._ingredient_tokens),
+                                 self._recipe_tokens(recipe)):
+            for token in tokens:
+                ids = index.get(token)
+                if ids is not None:
+                    ids.discard(meal_id)
+                    if not ids:
+                        del index[token]
+
+
+_index = LocalRecipeIndex()
+
+
+def get_index() -> LocalRecipeIndex:
+    """Get the module-level recipe index shared by the search strategies."""
+    return _index
+
+
+def set_index(index: LocalRecipeIndex) -> None:
+    """Replace the module-level recipe index."""
+    global _index
+    _index = index
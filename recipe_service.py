@@ -0,0 +1,409 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Recipe search and parsing without the voice pipeline.
+
+The skill's search strategies are thin wrappers around the functions here,
+so bulk jobs get the same data sources, title correction, caching and rate
+limiting. Queries can be run in parallel with `run_batch`, or from the
+command line, printing one JSON result per line:
+
+    python -m skill_recipes.recipe_service queries.txt --type ingredient
+"""
+
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Iterable, Iterator, List, Optional
+
+from ovos_utils.log import LOG
+
+from .api_client import API_KEY, API_URL_TEMPLATE, SEARCH, MealDBClient, \
+    TokenBucket, get_client, set_client
+from .ingredient_search import split_ingredients
+from .cache import ResponseCache
+from .data_sources import MultiSource, default_sources, get_sources, \
+    set_sources
+from .metrics import get_metrics
+from .quantities import adjust, describe
+from .recipe_index import get_index
+from .recipe_utils import CandidateRotation, Recipe, as_recipe
+from .title_index import get_titles
+
+_ingredient_candidates = CandidateRotation()
+
+
+def _record_stage(stage: str, seconds: float):
+    """Record the duration of one stage of a multi-request search."""
+    get_client().stats.record_stage(stage, seconds)
+    get_metrics().observe("recipes_stage_seconds", seconds, stage=stage)
+
+
+def search_random() -> Optional[dict]:
+    """Get a random recipe, from the local index if no source has one.
+
+    Returns:
+        dict: recipe data, None if there is none
+
+    """
+    return get_sources().random() or get_index().random()
+
+
+def search_by_name(recipe_name: str) -> Optional[dict]:
+    """Find a recipe by name.
+
+    Misheard names ("lazagna") are corrected against the titles of all
+    known recipes first, so only the best match is requested upstream.
+
+    Args:
+        recipe_name (str): the requested recipe name
+
+    Returns:
+        dict: recipe data, None if no recipe matches
+
+    """
+    return get_sources().by_name(recipe_name)
+
+
+def lookup_recipe(meal_id: str) -> Optional[dict]:
+    """Get a full recipe by its idMeal, preferring the local index.
+
+    Args:
+        meal_id (str): TheMealDB recipe id
+
+    Returns:
+        dict: recipe data, None if the request failed
+
+    """
+    return get_sources().lookup(meal_id)
+
+
+def index_titles_by_letter(letter: str) -> int:
+    """Add the titles of all recipes starting with a letter to the title index.
+
+    Args:
+        letter (str): first letter of the recipe names
+
+    Returns:
+        int: number of titles added
+
+    """
+    data = get_client().get_json(SEARCH, params={'f': letter})
+    return get_titles().add_meals(data.get('meals') if data else None)
+
+
+def search_by_ingredient(ingredient: str,
+                         user: Optional[str] = None) -> Optional[dict]:
+    """Find a recipe using one or more ingredients.
+
+    Several ingredients ("chicken and rice") are searched concurrently and
+    recipes using most of them are preferred.
+
+    Args:
+        ingredient (str): the requested ingredients
+        user (str): if given, repeating the search for this user rotates
+            through all the matching recipes
+
+    Returns:
+        dict: recipe data, None if no recipe matches
+
+    """
+    ingredients = split_ingredients(ingredient)
+    start = time.monotonic()
+    meal_ids = get_sources().by_ingredients(ingredients)
+    _record_stage("filter", time.monotonic() - start)
+    if user is None:
+        meal_id = meal_ids[0] if meal_ids else None
+    else:
+        meal_id = _ingredient_candidates.next((user, tuple(ingredients)),
+                                              meal_ids)
+    if not meal_id:
+        return None
+    start = time.monotonic()
+    recipe = lookup_recipe(meal_id)
+    _record_stage("lookup", time.monotonic() - start)
+    return recipe
+
+
+def upcoming_ingredient_candidates(ingredient: str, user: str,
+                                   count: int) -> tuple:
+    """Get the ids repeating an ingredient search would return next.
+
+    Args:
+        ingredient (str): the requested ingredients
+        user (str): the user who searched
+        count (int): number of upcoming recipes to return
+
+    Returns:
+        tuple: idMeal values
+
+    """
+    ingredients = split_ingredients(ingredient)
+    return _ingredient_candidates.peek((user, tuple(ingredients)), count)
+
+
+def recipe_to_json(recipe: Recipe, unit_system: Optional[str] = None,
+                   servings_scale: float = 1.0) -> dict:
+    """Get the parsed fields of a recipe as JSON-serializable data.
+
+    Args:
+        recipe (Recipe): the recipe
+        unit_system (str): "metric" or "imperial" to convert quantities to
+        servings_scale (float): servings relative to the recipe's, all
+            amounts are multiplied by it
+
+    Returns:
+        dict: id, name, category, area, steps and parsed ingredients
+
+    """
+    ingredients = []
+    for (name, measure), quantity in zip(recipe.ingredients,
+                                         recipe.quantities):
+        quantity = adjust(quantity, unit_system, servings_scale)
+        ingredients.append({'ingredient': name,
+                            'measure': measure,
+                            'amount': quantity.amount,
+                            'amount_max': quantity.amount_max,
+                            'unit': quantity.unit,
+                            'note': quantity.note,
+                            'text': describe(name, quantity)})
+    return {'id': recipe.recipe_id,
+            'name': recipe.name,
+            'category': recipe.category,
+            'area': recipe.area,
+            'steps': list(recipe.steps),
+            'ingredients': ingredients}
+
+
+# query type to the function answering it
+SEARCHES = {
+    'name': search_by_name,
+    'ingredient': search_by_ingredient,
+    'id': lookup_recipe,
+    'random': lambda query: search_random(),
+}
+
+
+def run_query(query: dict, unit_system: Optional[str] = None,
+              servings_scale: float = 1.0) -> dict:
+    """Answer a single query.
+
+    Args:
+        query (dict): "type" (one of `SEARCHES`, default "name") and "query"
+        unit_system (str): "metric" or "imperial" to convert quantities to
+        servings_scale (float): servings relative to the recipe's, all
+            amounts are multiplied by it
+
+    Returns:
+        dict: the query with "recipe" (None if nothing matched) and
+            "elapsed_ms", or with "error" if it failed
+
+    """
+    result = dict(query)
+    search = SEARCHES.get(query.get('type', 'name'))
+    if not search:
+        result['error'] = f"unknown query type: {query.get('type')}"
+        return result
+    start = time.perf_counter()
+    try:
+        recipe_data = search(query.get('query'))
+        result['recipe'] = recipe_to_json(as_recipe(recipe_data), unit_system,
+                                          servings_scale) \
+            if recipe_data else None
+    except Exception as e:
+        LOG.error(f"Query {query} failed: {e}")
+        result['error'] = str(e)
+    result['elapsed_ms'] = round((time.perf_counter() - start) * 1000, 3)
+    return result
+
+
+def run_batch(queries: Iterable[dict], workers: int = 8,
+              unit_system: Optional[str] = None,
+              servings_scale: float = 1.0) -> Iterator[dict]:
+    """Answer queries in parallel, yielding results as they complete.
+
+    At most a few queries per worker are read ahead, so an arbitrarily long
+    input is processed in constant memory.
+
+    Args:
+        queries (Iterable[dict]): queries as accepted by `run_query`
+        workers (int): queries answered concurrently
+        unit_system (str): "metric" or "imperial" to convert quantities to
+        servings_scale (float): servings relative to the recipe's, all
+            amounts are multiplied by it
+
+    Yields:
+        dict: a `run_query` result with the position of its query in "index"
+
+    """
+    def answer(index, query):
+        result = run_query(query, unit_system, servings_scale)
+        result['index'] = index
+        return result
+
+    with ThreadPoolExecutor(max_workers=workers,
+                            thread_name_prefix="recipe-batch") as executor:
+        pending = set()
+        for index, query in enumerate(queries):
+            pending.add(executor.submit(answer, index, query))
+            if len(pending) >= workers * 4:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                yield from (future.result() for future in done)
+        for future in pending:
+            yield future.result()
+
+
+def read_queries(lines: Iterable[str], default_type: str = 'name') -> Iterator[dict]:
+    """Parse input lines, either JSON objects or plain query text.
+
+    Args:
+        lines (Iterable[str]): input lines, blank ones are skipped
+        default_type (str): the type of plain text queries
+
+    Yields:
+        dict: queries for `run_query`
+
+    """
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith('{'):
+            try:
+                yield json.loads(line)
+                continue
+            except ValueError:
+                pass
+        yield {'type': default_type, 'query': line}
+
+
+def configure(api_key: str = API_KEY, api_url: Optional[str] = None,
+              rate: float = 2.0, burst: int = 10,
+              cache_path: Optional[str] = None,
+              local_recipes: Optional[str] = None,
+              offline: bool = False, mirror_urls: Iterable[str] = (),
+              deadline: Optional[float] = None) -> None:
+    """Set up the shared client and indexes for use outside the skill.
+
+    Unlike the skill's, queries wait for the rate limiter as long as it
+    takes instead of giving up after a few seconds, so a batch result
+    without a recipe means that nothing matched rather than that the
+    request was never sent.
+
+    Args:
+        api_key (str): TheMealDB API key
+        api_url (str): API root, built from `api_key` if not given
+        rate (float): API requests per second
+        burst (int): API requests that may be sent at once
+        cache_path (str): SQLite file keeping responses across runs
+        local_recipes (str): TheMealDB-format JSON dump to search first
+        offline (bool): never call the API, answer from the cache and the
+            local recipes only
+        mirror_urls (Iterable[str]): roots of other servers implementing
+            the API, e.g. a local mock server, queried in parallel with it
+        deadline (float): seconds the API and each mirror may take, None
+            for no limit
+
+    Returns:
+        None
+
+    """
+    def limiter():
+        return TokenBucket(rate=0, capacity=0) if offline else \
+            TokenBucket(rate=rate, capacity=burst, max_wait=None)
+
+    cache = ResponseCache(path=cache_path)
+    set_client(MealDBClient(base_url=api_url or API_URL_TEMPLATE.format(api_key),
+                            cache=cache, limiter=limiter()))
+    # mirrors serve the same data, so their responses share the cache
+    mirrors = [MealDBClient(base_url=url, cache=cache, limiter=limiter())
+               for url in mirror_urls]
+    set_sources(MultiSource(default_sources(mirrors, deadline)))
+    if local_recipes:
+        get_index().load(local_recipes)
+        get_titles().add_meals(get_index().meals())
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog='python -m skill_recipes.recipe_service',
+        description='Look up recipes in bulk, printing one JSON result per '
+                    'line in completion order.')
+    parser.add_argument('input', nargs='?', default='-',
+                        help='file with one query per line, as plain text or '
+                             '{"type": ..., "query": ...}; - for stdin')
+    parser.add_argument('--type', default='name', choices=sorted(SEARCHES),
+                        help='type of the plain text queries')
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--unit-system', choices=('metric', 'imperial'))
+    parser.add_argument('--servings-scale', type=float, default=1.0,
+                        help='multiply all amounts, e.g. 2 for twice as '
+                             'many servings')
+    parser.add_argument('--local-recipes',
+                        help='TheMealDB-format JSON dump to search first')
+    parser.add_argument('--cache', help='SQLite file caching API responses')
+    parser.add_argument('--api-key', default=API_KEY)
+    parser.add_argument('--api-url')
+    parser.add_argument('--rate', type=float, default=2.0,
+                        help='API requests per second')
+    parser.add_argument('--offline', action='store_true',
+                        help='never call the API')
+    parser.add_argument('--mirror', action='append', default=[],
+                        help='root of another server implementing the API, '
+                             'queried in parallel; may be repeated')
+    parser.add_argument('--deadline', type=float,
+                        help='seconds the API and each mirror may take, '
+                             'unlimited by default')
+    args = parser.parse_args(argv)
+
+    # ovos_utils logs to sys.stdout, keep it for the results
+    out, sys.stdout = sys.stdout, sys.stderr
+    lines = sys.stdin if args.input == '-' else \
+        open(args.input, encoding='utf-8')
+    try:
+        configure(api_key=args.api_key, api_url=args.api_url, rate=args.rate,
+                  cache_path=args.cache, local_recipes=args.local_recipes,
+                  offline=args.offline, mirror_urls=args.mirror,
+                  deadline=args.deadline)
+        for result in run_batch(read_queries(lines, args.type),
+                                args.workers, args.unit_system,
+                                args.servings_scale):
+            print(json.dumps(result, ensure_ascii=False), file=out, flush=True)
+    finally:
+        if lines is not sys.stdin:
+            lines.close()
+        get_client().cache.close()
+        set_sources(None)
+        set_client(None)
+        sys.stdout = out
+
+
+if __name__ == '__main__':
+    main()
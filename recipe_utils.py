@@ -26,52 +26,269 @@
 # NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
 # SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
+from collections import OrderedDict
+from sys import getsizeof, intern
+from threading import Lock, RLock
+from time import monotonic
+from typing import TYPE_CHECKING, Callable, Hashable, Optional, \
+    Sequence, Tuple, Union
+from weakref import WeakValueDictionary
+
+from .ingredient_lookup import IngredientLookup
+from .quantities import Quantity, parse_quantity
+from .segmentation import iter_steps
+
+if TYPE_CHECKING:
+    # sqlite3 and the logger are only needed once a store is configured
+    from .session_store import SessionStore
+
+
+def parse_instructions(instruction_text: Optional[str]) -> Tuple[str, ...]:
+    """Split instruction text into steps.
+
+    Args:
+        instruction_text (str): the strInstructions value of a recipe
+
+    Returns:
+        tuple: recipe steps
+
+    """
+    return tuple(iter_steps(instruction_text))
+
+
+def parse_ingredients(recipe_data: dict) -> Tuple[Tuple[str, Optional[str]], ...]:
+    """Get ingredient-quantity pairs from the strIngredientN/strMeasureN keys.
+
+    Args:
+        recipe_data (dict): contains recipe data returned from an API call
+
+    Returns:
+        tuple: (ingredient, quantity) pairs, quantity is None if not measured
+
+    """
+    ingredients = []
+    for i in range(1, 21):
+        ingredient = recipe_data.get('strIngredient' + str(i))
+        if not ingredient:
+            break
+        # ingredient names repeat across recipes and users
+        measure = recipe_data.get('strMeasure' + str(i)) or None
+        ingredients.append((intern(ingredient), measure))
+    return tuple(ingredients)
+
+
+class _IngredientData:
+
+    __slots__ = ('ingredients', 'quantities', '_lookup', '__weakref__')
+
+    def __init__(self, ingredients: Tuple[Tuple[str, Optional[str]], ...],
+                 quantities: Sequence[Quantity]):
+        """The parsed ingredients of a recipe, shared by equal recipes.
+
+        Args:
+            ingredients (tuple): (ingredient, measure) pairs
+            quantities (Sequence[Quantity]): the parsed measure of each
+                ingredient, in the same order
+        """
+        self.ingredients = ingredients
+        # in the same order: an ingredient may be listed more than once
+        self.quantities = tuple(quantities)
+        self._lookup = None
+
+    @property
+    def lookup(self) -> IngredientLookup:
+        # only built once a user asks about an ingredient; a race builds
+        # it twice, which is harmless
+        if self._lookup is None:
+            self._lookup = IngredientLookup(
+                ingredient for ingredient, _ in self.ingredients)
+        return self._lookup
+
+
+# every user cooking the same dish shares one copy of its ingredients
+_shared_ingredients = WeakValueDictionary()
+_shared_ingredients_lock = Lock()
+
+
+def _ingredient_data(ingredients: Tuple[Tuple[str, Optional[str]], ...],
+                     quantities: Optional[Sequence[Quantity]] = None
+                     ) -> _IngredientData:
+    """Get the shared parsed data of an ingredient list.
+
+    Args:
+        ingredients (tuple): (ingredient, measure) pairs
+        quantities (Sequence[Quantity]): the parsed measures, parsed here
+            if None and not shared yet
+
+    Returns:
+        _IngredientData: the data, shared with every equal ingredient list
+
+    """
+    with _shared_ingredients_lock:
+        data = _shared_ingredients.get(ingredients)
+    if data is None:
+        if quantities is None:
+            quantities = [parse_quantity(measure) for _, measure in ingredients]
+        data = _IngredientData(ingredients, quantities)
+        with _shared_ingredients_lock:
+            data = _shared_ingredients.setdefault(ingredients, data)
+    return data
+
+
 class Recipe:
 
+    # API keys still answered by `get`, mapped to the attributes keeping them
+    _fields = {'idMeal': 'recipe_id',
+               'strMeal': 'name',
+               'strCategory': 'category',
+               'strArea': 'area'}
+
+    __slots__ = ('recipe_id', 'name', 'category', 'area', 'steps',
+                 'ingredient_data', 'current_index')
+
     def __init__(self, recipe_data: dict, current_index: int = 0):
         """Stores recipe-related info.
 
+        The API payload is parsed once into step and ingredient tuples, a
+        map of the parsed ingredient quantities and an index answering which
+        ingredient a user asks about; the remaining raw keys are not kept.
+        The ingredient data is shared by all recipes listing the same
+        ingredients, and the index is only built on the first question.
+
         Args:
             recipe_data (dict): contains recipe data returned from an API call
             current_index (int): keeps track of the current instruction index
         """
-        self.recipe_data = recipe_data
+        self._set_fields(recipe_data.get('idMeal'), recipe_data.get('strMeal'),
+                         recipe_data.get('strCategory'),
+                         recipe_data.get('strArea'),
+                         parse_instructions(recipe_data.get('strInstructions')),
+                         _ingredient_data(parse_ingredients(recipe_data)),
+                         current_index)
+
+    @classmethod
+    def from_fields(cls, recipe_id: str, name: Optional[str],
+                    category: Optional[str], area: Optional[str],
+                    steps: Tuple[str, ...],
+                    ingredients: Tuple[Tuple[str, Optional[str]], ...],
+                    quantities: Sequence[Quantity],
+                    current_index: int = 0) -> 'Recipe':
+        """Build a recipe from already parsed fields, e.g. from a snapshot.
+
+        Args:
+            recipe_id (str): the idMeal value
+            name (str): the strMeal value
+            category (str): the strCategory value
+            area (str): the strArea value
+            steps (tuple): recipe steps
+            ingredients (tuple): (ingredient, measure) pairs
+            quantities (Sequence[Quantity]): the parsed measure of each
+                ingredient, in the same order
+            current_index (int): keeps track of the current instruction index
+
+        Returns:
+            Recipe: the recipe
+
+        """
+        recipe = cls.__new__(cls)
+        recipe._set_fields(recipe_id, name, category, area, steps,
+                           _ingredient_data(ingredients, quantities),
+                           current_index)
+        return recipe
+
+    def _set_fields(self, recipe_id, name, category, area, steps,
+                    ingredient_data, current_index) -> None:
+        self.recipe_id = recipe_id
+        self.name = name
+        self.category = category
+        self.area = area
+        self.steps = steps
+        self.ingredient_data = ingredient_data
         self.current_index = current_index
 
+    @property
+    def ingredients(self) -> Tuple[Tuple[str, Optional[str]], ...]:
+        """(ingredient, measure) pairs, measure is None if not measured."""
+        return self.ingredient_data.ingredients
+
+    @property
+    def quantities(self) -> Tuple[Quantity, ...]:
+        """Parsed quantity of each ingredient, in the order of `ingredients`."""
+        return self.ingredient_data.quantities
+
     def get(self, item: str, default=None):
-        """Get a value for an item-key from the recipe data.
+        """Get a value for an API key of the recipe.
 
         Args:
-            item (str): a key for self.recipe_data dict
+            item (str): one of idMeal, strMeal, strCategory or strArea
             default: the default value to return is no match for item
 
         Returns:
-            value from the dict
+            the stored value
 
         """
-        return self.recipe_data.get(item, default)
+        attr = self._fields.get(item)
+        value = getattr(self, attr) if attr else None
+        return default if value is None else value
 
-    def set(self, item, value):
-        """Set the value for the item key in self.recipe_data.
+    def get_quantity(self, ingredient: str) -> Optional[Quantity]:
+        """Get the parsed quantity of an ingredient of the recipe.
 
         Args:
-            item: a key for the dict key-value pair
-            value: a value for the dict key-value pair
+            ingredient (str): the ingredient name, in any case
 
         Returns:
-            None
+            Quantity: the quantity, of its first listing if the recipe lists
+                the ingredient more than once, None if it does not use it
 
         """
-        self.recipe_data[item] = value
+        ingredient = ingredient.lower()
+        for (name, _), quantity in zip(self.ingredients, self.quantities):
+            if name.lower() == ingredient:
+                return quantity
+        return None
+
+    def find_ingredient(self, query: str) -> Optional[str]:
+        """Find the recipe ingredient a user asks about.
 
-    def get_recipe_data(self) -> dict:
-        """Get the recipe data dict.
+        Args:
+            query (str): the ingredient as said, e.g. "tomato" for "Tomatoes"
 
         Returns:
-            dict: self.recipe_data
+            str: the ingredient name as written in the recipe, None if the
+                recipe does not use it
 
         """
-        return self.recipe_data
+        return self.ingredient_data.lookup.find(query)
+
+    def get_step(self, index: int) -> Optional[str]:
+        """Get a recipe step.
+
+        Args:
+            index (int): index of the step
+
+        Returns:
+            str: the step, None if the index is out of range
+
+        """
+        if 0 <= index < len(self.steps):
+            return self.steps[index]
+        return None
+
+    def to_dict(self) -> dict:
+        """Build a TheMealDB-format dict with the data kept by the recipe.
+
+        Returns:
+            dict: recipe data that `Recipe` can be built from again
+
+        """
+        recipe_data = {key: getattr(self, attr)
+                       for key, attr in self._fields.items()}
+        recipe_data['strInstructions'] = '\n'.join(self.steps)
+        for i, (ingredient, measure) in enumerate(self.ingredients, 1):
+            recipe_data['strIngredient' + str(i)] = ingredient
+            recipe_data['strMeasure' + str(i)] = measure
+        return recipe_data
 
     def get_current_index(self) -> int:
         """Get the current step of the recipe instructions
@@ -95,11 +312,116 @@ class Recipe:
         self.current_index = new_index
 
 
+def as_recipe(recipe_data: Union[dict, Recipe],
+              current_index: int = 0) -> Recipe:
+    """Build a recipe from API data; a recipe a snapshot built is kept.
+
+    Args:
+        recipe_data (dict): recipe data returned by a search, or a `Recipe`
+        current_index (int): keeps track of the current instruction index
+
+    Returns:
+        Recipe: the recipe
+
+    """
+    if isinstance(recipe_data, Recipe):
+        recipe_data.update_current_index(current_index)
+        return recipe_data
+    return Recipe(recipe_data, current_index=current_index)
+
+
+def recipe_size(recipe: Recipe) -> int:
+    """Estimate the memory held by a recipe, in bytes.
+
+    Args:
+        recipe (Recipe): the recipe to measure
+
+    Returns:
+        int: size of the object, its steps and the strings they reference;
+            the ingredient data shared with equal recipes is measured by
+            `ingredient_data_size`
+
+    """
+    size = getsizeof(recipe) + getsizeof(recipe.steps)
+    for value in (recipe.recipe_id, recipe.name, recipe.category, recipe.area):
+        size += getsizeof(value) if value is not None else 0
+    size += sum(getsizeof(step) for step in recipe.steps)
+    return size
+
+
+def ingredient_data_size(data: _IngredientData) -> int:
+    """Estimate the memory held by the shared ingredient data of a recipe.
+
+    Args:
+        data (_IngredientData): the `Recipe.ingredient_data` to measure
+
+    Returns:
+        int: size of the ingredient tuples, quantities and lookup
+
+    """
+    size = getsizeof(data) + getsizeof(data.ingredients) + \
+        getsizeof(data.quantities)
+    for pair in data.ingredients:
+        size += getsizeof(pair) + sum(getsizeof(value) for value in pair
+                                      if value is not None)
+    for quantity in data.quantities:
+        size += getsizeof(quantity) + getsizeof(quantity.note)
+    if data._lookup is not None:
+        size += getsizeof(data._lookup)
+    return size
+
+
 class RecipeStorage:
 
-    def __init__(self):
-        """Maps recipes to users."""
-        self.recipes = {}
+    def __init__(self, max_users: int = 1000, idle_timeout: float = 6 * 3600,
+                 session_store: Optional['SessionStore'] = None,
+                 recipe_loader: Optional[Callable[[str], Optional[dict]]] = None):
+        """Maps recipes to users.
+
+        The least recently used recipe is evicted once `max_users` users hold
+        one, and recipes nobody touched for `idle_timeout` seconds expire.
+        With a session store, the recipe id and step of every user are also
+        persisted; a user missing from memory is then restored on first
+        access by fetching their recipe through `recipe_loader`.
+
+        Args:
+            max_users (int): users kept before evicting the least recent one
+            idle_timeout (float): seconds of inactivity before expiry
+            session_store (SessionStore): optional durable session backend
+            recipe_loader (Callable): gets recipe data by idMeal
+        """
+        self.max_users = max_users
+        self.idle_timeout = idle_timeout
+        self.session_store = session_store
+        self.recipe_loader = recipe_loader
+        self.recipes = OrderedDict()
+        self.evictions = 0
+        self.expirations = 0
+        self._last_access = {}
+        self._sizes = {}
+        self._bytes = 0
+        # id of shared ingredient data -> [recipes using it, size]
+        self._shared = {}
+        # a lock lives as long as someone holds or waits for it
+        self._user_locks = WeakValueDictionary()
+        self._lock = RLock()
+
+    def user_lock(self, user: str) -> RLock:
+        """Get the lock serializing changes to a user's recipe.
+
+        Args:
+            user (str): the user whose recipe is changed
+
+        Returns:
+            RLock: the same lock for every call with the same user while
+                the lock is referenced
+
+        """
+        with self._lock:
+            lock = self._user_locks.get(user)
+            if lock is None:
+                lock = self._user_locks[user] = RLock()
+            return lock
 
     def assign_recipe(self, user: str, recipe: Recipe) -> None:
         """Assign recipe to a user.
@@ -112,16 +434,188 @@ class RecipeStorage:
             None
 
         """
-        self.recipes[user] = recipe
+        self._store(user, recipe)
+        if self.session_store:
+            self.session_store.save(user, recipe.recipe_id,
+                                    recipe.current_index)
 
-    def get_current_recipe(self, user: str) -> Recipe:
+    def get_current_recipe(self, user: str) -> Optional[Recipe]:
         """Get the recipe for a specific user.
 
         Args:
             user (str): a user to get their recipe for
 
         Returns:
-            Recipe: the recipe object
+            Recipe: the recipe object, None if there is none or it expired
+
+        """
+        with self._lock:
+            self._expire()
+            recipe = self.recipes.get(user)
+            if recipe is not None:
+                self.recipes.move_to_end(user)
+                self._last_access[user] = monotonic()
+                return recipe
+        return self._restore(user)
+
+    def update_current_index(self, user: str, new_index: int) -> None:
+        """Move a user to another step of their recipe.
+
+        Args:
+            user (str): the user navigating the recipe
+            new_index (int): index value to be assigned
+
+        Returns:
+            None
+
+        """
+        with self.user_lock(user):
+            recipe = self.get_current_recipe(user)
+            if recipe is None:
+                return
+            recipe.update_current_index(new_index)
+            if self.session_store:
+                self.session_store.save(user, recipe.recipe_id, new_index)
+
+    def remove_recipe(self, user: str) -> None:
+        """Forget the recipe of a user.
+
+        Args:
+            user (str): the user to forget the recipe for
+
+        Returns:
+            None
+
+        """
+        with self._lock:
+            self._remove(user)
+        if self.session_store:
+            self.session_store.delete(user)
+
+    def stats(self) -> dict:
+        """Get live usage numbers.
+
+        Returns:
+            dict: stored users, estimated bytes, evictions and expirations
+
+        """
+        with self._lock:
+            return {"users": len(self.recipes),
+                    "max_users": self.max_users,
+                    "bytes": self._bytes,
+                    "evictions": self.evictions,
+                    "expirations": self.expirations}
+
+    def _store(self, user: str, recipe: Recipe) -> None:
+        size = recipe_size(recipe)
+        shared_size = ingredient_data_size(recipe.ingredient_data)
+        with self._lock:
+            self._remove(user)
+            self.recipes[user] = recipe
+            self._last_access[user] = monotonic()
+            self._sizes[user] = size
+            self._bytes += size
+            # shared data is counted once, however many users cook the dish
+            shared = self._shared.setdefault(id(recipe.ingredient_data),
+                                             [0, shared_size])
+            if not shared[0]:
+                self._bytes += shared_size
+            shared[0] += 1
+            self._expire()
+            while len(self.recipes) > self.max_users:
+                self._remove(next(iter(self.recipes)))
+                self.evictions += 1
+
+    def _restore(self, user: str) -> Optional[Recipe]:
+        """Rebuild a user's recipe from their persisted session."""
+        if not self.session_store or not self.recipe_loader:
+            return None
+        session = self.session_store.load(user)
+        if not session:
+            return None
+        recipe_id, current_index = session
+        recipe_data = self.recipe_loader(recipe_id) if recipe_id else None
+        if not recipe_data:
+            return None
+        recipe = as_recipe(recipe_data, current_index)
+        self._store(user, recipe)
+        return recipe
+
+    def _expire(self) -> None:
+        """Drop idle recipes; the least recently used ones come first."""
+        deadline = monotonic() - self.idle_timeout
+        while self.recipes:
+            user = next(iter(self.recipes))
+            if self._last_access[user] > deadline:
+                break
+            self._remove(user)
+            self.expirations += 1
+
+    def _remove(self, user: str) -> None:
+        recipe = self.recipes.pop(user, None)
+        if recipe is not None:
+            del self._last_access[user]
+            self._bytes -= self._sizes.pop(user)
+            key = id(recipe.ingredient_data)
+            shared = self._shared[key]
+            shared[0] -= 1
+            if not shared[0]:
+                self._bytes -= shared[1]
+                del self._shared[key]
+
+
+class CandidateRotation:
+
+    def __init__(self, max_keys: int = 1024):
+        """Remembers search candidates so repeated queries rotate through them.
+
+        Args:
+            max_keys (int): queries remembered before the oldest is dropped
+        """
+        self.max_keys = max_keys
+        self._rotations = OrderedDict()
+        self._lock = Lock()
+
+    def next(self, key: Hashable, candidates: Sequence):
+        """Get the next candidate for a query.
+
+        The first call for a key returns the first candidate, each following
+        call with the same candidates returns the next one, wrapping around.
+        A different candidate list restarts the rotation.
+
+        Args:
+            key (Hashable): identifies the query, e.g. (user, ingredient)
+            candidates (Sequence): search results for the query
+
+        Returns:
+            the selected candidate, None if there are no candidates
+
+        """
+        if not candidates:
+            return None
+        candidates = tuple(candidates)
+        with self._lock:
+            previous, cursor = self._rotations.pop(key, (None, -1))
+            cursor = cursor + 1 if previous == candidates else 0
+            cursor %= len(candidates)
+            self._rotations[key] = (candidates, cursor)
+            if len(self._rotations) > self.max_keys:
+                self._rotations.popitem(last=False)
+        return candidates[cursor]
+
+    def peek(self, key: Hashable, count: int = 1) -> tuple:
+        """Get the candidates the next calls to `next` will return.
+
+        Args:
+            key (Hashable): identifies the query
+            count (int): number of upcoming candidates to return
+
+        Returns:
+            tuple: upcoming candidates, empty for an unknown query
 
         """
-        return self.recipes.get(user, None)
+        with self._lock:
+            candidates, cursor = self._rotations.get(key, ((), -1))
+        count = min(count, len(candidates) - 1)
+        return tuple(candidates[(cursor + i) % len(candidates)]
+                     for i in range(1, count + 1))
@@ -0,0 +1,150 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+from collections import deque
+from threading import Event, Semaphore, Thread
+from typing import Callable, Iterable, Optional, Tuple
+
+from ovos_utils.log import LOG
+
+# spoken words per second used to bound the wait for a step to be spoken
+WORDS_PER_SECOND = 2.5
+
+
+class Recitation:
+
+    def __init__(self, steps: Iterable[Tuple[int, str]],
+                 speak: Callable[[str], None],
+                 on_step: Callable[[int], None],
+                 lookahead: int = 1,
+                 on_done: Optional[Callable[[], None]] = None,
+                 key: Optional[str] = None):
+        """Speaks recipe steps one after another on a background thread.
+
+        Up to `lookahead` steps are handed to TTS before the step being
+        played has finished, so the next step is synthesized while the
+        current one plays. `utterance_finished` must be called whenever one
+        of the queued steps ends, and only then; without it a step is
+        assumed spoken after an estimate based on its length.
+
+        Args:
+            steps (Iterable): (index, step) pairs, consumed lazily
+            speak (Callable): queues a step for TTS without blocking
+            on_step (Callable): called with the index of the step now playing
+            lookahead (int): steps queued ahead of the one playing
+            on_done (Callable): called once the recitation ends or is cancelled
+            key (str): identifies the utterances of this recitation
+        """
+        self.steps = steps
+        self.speak = speak
+        self.on_step = on_step
+        self.lookahead = lookahead
+        self.on_done = on_done
+        self.key = key
+        self._finished = Semaphore(0)
+        self._resumed = Event()
+        self._resumed.set()
+        self._cancelled = Event()
+        self._playing = deque()
+        self._thread = Thread(target=self._run, daemon=True,
+                              name="recipe-recitation")
+
+    @property
+    def paused(self) -> bool:
+        return not self._resumed.is_set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def start(self) -> 'Recitation':
+        self._thread.start()
+        return self
+
+    def utterance_finished(self) -> None:
+        """Signal that TTS finished speaking one of the queued steps."""
+        self._finished.release()
+
+    def pause(self) -> None:
+        """Stop queueing steps; queued ones are still spoken."""
+        self._resumed.clear()
+
+    def resume(self) -> None:
+        self._resumed.set()
+
+    def cancel(self) -> None:
+        """Stop the recitation; the step being played stays current."""
+        self._cancelled.set()
+        self._resumed.set()
+        self._finished.release()
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        try:
+            for index, step in self.steps:
+                while not self.cancelled:
+                    if self.paused:
+                        self._wait_for_step(timeout=0.1)
+                    elif len(self._playing) > self.lookahead:
+                        self._wait_for_step()
+                    else:
+                        break
+                if self.cancelled:
+                    return
+                self.speak(step)
+                self._playing.append((index, step))
+                if len(self._playing) == 1:
+                    self.on_step(index)
+            while self._playing and not self.cancelled:
+                self._wait_for_step()
+        except Exception as e:
+            LOG.error(f"Recitation failed: {e}")
+        finally:
+            if self.on_done:
+                self.on_done()
+
+    def _wait_for_step(self, timeout: Optional[float] = None) -> None:
+        """Wait until the step being played ends, then move to the next one."""
+        if not self._playing:
+            if timeout:
+                self._cancelled.wait(timeout)
+            return
+        if timeout is None:
+            words = len(self._playing[0][1].split())
+            timeout = 2 + words / WORDS_PER_SECOND
+            # a missed end-of-speech event should not stall the recitation
+            self._finished.acquire(timeout=timeout)
+        elif not self._finished.acquire(timeout=timeout):
+            return
+        if self.cancelled:
+            return
+        self._playing.popleft()
+        if self._playing:
+            self.on_step(self._playing[0][0])
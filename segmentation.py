@@ -0,0 +1,83 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import re
+from typing import Iterator, Optional
+
+# lines are separated by any run of line breaks
+_LINES = re.compile(r'[^\r\n]+')
+# a sentence ends with terminal punctuation followed by whitespace and the
+# start of a new sentence; "1.5 cups" has no whitespace after the period
+_SENTENCE_END = re.compile(r'[.!?]+["\')]?\s+(?=[A-Z0-9"\'(*])')
+# abbreviations whose period does not end a sentence
+_ABBREVIATION = re.compile(
+    r'\b(?:approx|appr|tbsp|tbs|tblsp|tsp|oz|lb|lbs|pt|qt|fl|pkg|vs|'
+    r'e\.g|i\.e|dr|mr|mrs)\.$', re.IGNORECASE)
+# "STEP 1", "Step 2:", "3." or "4)" in front of (or instead of) a step;
+# "1.5 kg" starts with an amount, not an enumerator
+_ENUMERATOR = re.compile(r'^\s*(?:step\s*\d+\s*[:.)\-–]?|\d{1,2}[.)](?!\d))\s*',
+                         re.IGNORECASE)
+_TRAILING = re.compile(r'[\s.]+$')
+_WORD = re.compile(r'[^\W\d_]{2,}')
+
+
+def iter_steps(instruction_text: Optional[str]) -> Iterator[str]:
+    """Lazily split instruction text into speakable steps.
+
+    Every line is split into sentences. Line breaks always end a step,
+    numbered headings such as "STEP 1" are dropped, and periods in decimals
+    ("1.5 cups") or after abbreviations ("approx.") do not split a step.
+
+    Args:
+        instruction_text (str): the strInstructions value of a recipe
+
+    Yields:
+        str: steps without their final period, in order
+
+    """
+    if not instruction_text:
+        return
+    for line in _LINES.finditer(instruction_text):
+        line = line.group()
+        start = 0
+        for end in _SENTENCE_END.finditer(line):
+            if _ABBREVIATION.search(line, start, end.start() + 1):
+                continue
+            step = _clean(line[start:end.start() + len(end.group().rstrip())])
+            if step:
+                yield step
+            start = end.end()
+        step = _clean(line[start:])
+        if step:
+            yield step
+
+
+def _clean(step: str) -> Optional[str]:
+    """Strip enumerators and the final period; drop steps without words."""
+    step = _TRAILING.sub('', _ENUMERATOR.sub('', step, count=1))
+    return step if _WORD.search(step) else None
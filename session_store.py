@@ -0,0 +1,148 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import sqlite3
+import time
+from threading import Event, Lock, Thread
+from typing import Optional, Tuple
+
+from ovos_utils.log import LOG
+
+
+class SessionStore:
+
+    def __init__(self, path: str, flush_interval: float = 2.0,
+                 batch_size: int = 64, max_age: float = 7 * 24 * 3600):
+        """Durable per-user cooking sessions backed by SQLite.
+
+        Only the recipe id and the step index are stored. Writes are queued
+        in memory and flushed in batches by a background thread, so callers
+        never wait for the disk; repeated writes for the same user between
+        flushes are coalesced into one.
+
+        Args:
+            path (str): SQLite database file
+            flush_interval (float): seconds between background flushes
+            batch_size (int): pending users that trigger an early flush
+            max_age (float): sessions untouched for longer are dropped on open
+        """
+        self.path = path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._pending = {}
+        self._lock = Lock()
+        self._db_lock = Lock()
+        self._wakeup = Event()
+        self._stopping = Event()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._db:
+            self._db.execute("CREATE TABLE IF NOT EXISTS sessions "
+                             "(user TEXT PRIMARY KEY, recipe_id TEXT, "
+                             "step_index INTEGER, updated REAL)")
+            self._db.execute("DELETE FROM sessions WHERE updated < ?",
+                             (time.time() - max_age,))
+        self._thread = Thread(target=self._run, daemon=True,
+                              name="recipe-session-writer")
+        self._thread.start()
+
+    def save(self, user: str, recipe_id: Optional[str], step_index: int) -> None:
+        """Queue a session write.
+
+        Args:
+            user (str): the session owner
+            recipe_id (str): idMeal of the current recipe
+            step_index (int): the current instruction index
+
+        Returns:
+            None
+
+        """
+        with self._lock:
+            self._pending[user] = (recipe_id, step_index, time.time())
+            if len(self._pending) >= self.batch_size:
+                self._wakeup.set()
+
+    def delete(self, user: str) -> None:
+        """Queue the removal of a user's session."""
+        with self._lock:
+            self._pending[user] = None
+            if len(self._pending) >= self.batch_size:
+                self._wakeup.set()
+
+    def load(self, user: str) -> Optional[Tuple[str, int]]:
+        """Get a user's session, including writes that are not flushed yet.
+
+        Args:
+            user (str): the session owner
+
+        Returns:
+            tuple: (recipe_id, step_index), None if there is no session
+
+        """
+        with self._lock:
+            if user in self._pending:
+                pending = self._pending[user]
+                return pending[:2] if pending else None
+        with self._db_lock:
+            row = self._db.execute("SELECT recipe_id, step_index FROM "
+                                   "sessions WHERE user = ?",
+                                   (user,)).fetchone()
+        return tuple(row) if row else None
+
+    def flush(self) -> None:
+        """Write all pending changes in a single transaction."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        upserts = [(user, *values) for user, values in pending.items()
+                   if values]
+        deletes = [(user,) for user, values in pending.items() if not values]
+        try:
+            with self._db_lock, self._db:
+                self._db.executemany("INSERT OR REPLACE INTO sessions "
+                                     "VALUES (?, ?, ?, ?)", upserts)
+                self._db.executemany("DELETE FROM sessions WHERE user = ?",
+                                     deletes)
+        except sqlite3.Error as e:
+            LOG.error(f"Could not persist {len(pending)} sessions: {e}")
+
+    def close(self) -> None:
+        """Stop the writer thread after a final flush."""
+        self._stopping.set()
+        self._wakeup.set()
+        self._thread.join()
+        self.flush()
+        with self._db_lock:
+            self._db.close()
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
@@ -0,0 +1,558 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import time
+from functools import partial
+from os.path import isfile, join
+from string import ascii_lowercase
+from threading import Thread
+from typing import Optional
+from uuid import uuid4
+
+from mycroft import Message, intent_handler
+from neon_utils.skills.instructor_skill import InstructorSkill
+from neon_utils.message_utils import get_message_user
+from ovos_utils import classproperty
+from ovos_utils.log import LOG
+from ovos_utils.process_utils import RuntimeRequirements
+from .api_client import API_KEY, API_URL_TEMPLATE, SEARCH, LOOKUP, \
+    MealDBClient, TokenBucket, get_client, set_client
+from .cache import ResponseCache
+from .data_sources import MealDBSource, MultiSource, default_sources, \
+    get_sources, set_sources
+from .metrics import get_metrics, instrumented
+from .prefetch import Prefetcher
+from .quantities import adjust, describe, to_spoken
+from .recipe_index import get_index
+from .recipe_service import index_titles_by_letter, lookup_recipe, \
+    search_by_ingredient, search_by_name, search_random, \
+    upcoming_ingredient_candidates
+from .recitation import Recitation
+from .recipe_utils import Recipe, RecipeStorage, as_recipe, \
+    parse_ingredients, parse_instructions
+from .session_store import SessionStore
+from .title_index import get_titles
+
+
+# strategies for searching (functional approach)
+@instrumented('recipes_search_seconds')
+def execute_search_random(message: Message) -> Optional[dict]:
+    """
+    Search a random meal in the DB
+    :param message: a Message object associated with the request, a dummy param here to implement a common interface
+    :return: dict with the recipe data, None if request failed
+    """
+    return search_random()
+
+
+@instrumented('recipes_search_seconds')
+def execute_search_by_name(message: Message) -> Optional[dict]:
+    """
+    Search TheMealsDB for a meal recipe by recipe_name.
+    Misheard names ("lazagna") are corrected against the titles of all known
+    recipes first, so only the best match is requested upstream.
+    :param message: a Message object associated with the request
+    :return: dict with the recipe data, None if request failed
+    """
+    return search_by_name(message.data.get("recipe_name"))
+
+
+@instrumented('recipes_search_seconds')
+def execute_search_by_ingredient(message: Message) -> Optional[dict]:
+    """
+    Search TheMealsDB for a meal recipe by one or more ingredients.
+    Several ingredients ("chicken and rice") are searched concurrently and
+    recipes using most of them are preferred.
+    Repeating the search rotates through all the matching recipes.
+    :param message: a Message object associated with the request
+    :return: dict with the recipe data, None if request failed
+    """
+    return search_by_ingredient(message.data.get("ingredient"),
+                                user=get_message_user(message))
+
+
+class RecipeSkill(InstructorSkill):
+    def __init__(self, **kwargs):
+        # before the base class, which calls `initialize` when given a bus
+        self._create_state()
+        InstructorSkill.__init__(self, **kwargs)
+        self.internal_language = "en"
+
+    def _create_state(self):
+        """
+        Create the objects `initialize` configures and the handlers use
+        """
+        self.recipe_storage = RecipeStorage()
+        self.prefetcher = Prefetcher()
+        self._recitations = {}
+        self._data_loader = None
+        self.unit_system = None
+        self.servings_scale = 1
+
+    def initialize(self):
+        self.recipe_storage.max_users = self.settings.get("max_sessions", 1000)
+        self.recipe_storage.idle_timeout = \
+            self.settings.get("session_timeout", 6 * 3600)
+        self.recipe_storage.session_store = \
+            SessionStore(join(self.file_system.path, "sessions.sqlite"))
+        self.recipe_storage.recipe_loader = lookup_recipe
+        self._access_data_source()
+        self.prefetcher.budget.requests_per_minute = \
+            self.settings.get("prefetch_budget", 30)
+        self.prefetcher.queue_size = self.settings.get("prefetch_queue_size", 3)
+        # searches work without the cache and local recipes, so they are
+        # loaded in the background instead of delaying the skill's startup
+        self._data_loader = Thread(target=self._load_data,
+                                   name="recipe-data-loader", daemon=True)
+        self._data_loader.start()
+        get_metrics().enabled = self.settings.get("metrics_enabled", False)
+        self.unit_system = self.settings.get("unit_system") or None
+        self.servings_scale = self.settings.get("servings_scale") or 1
+        self.add_event("recipes.metrics", self.handle_metrics_request)
+        self.add_event("recipes.recitation.pause", self.handle_pause_recitation)
+        self.add_event("recipes.recitation.resume", self.handle_resume_recitation)
+        self.add_event("recipes.recitation.stop", self.handle_stop_recitation)
+        self.add_event("recognizer_loop:audio_output_end",
+                       self._on_audio_output_end)
+
+    def shutdown(self):
+        self.stop()
+        if self._data_loader:
+            self._data_loader.join(timeout=5)
+        self.prefetcher.shutdown()
+        get_sources().close()
+        get_index().close()
+        if self.recipe_storage.session_store:
+            self.recipe_storage.session_store.close()
+        client = get_client()
+        if client.cache:
+            client.cache.close()
+
+    @classproperty
+    def runtime_requirements(self):
+        return RuntimeRequirements(network_before_load=False,
+                                   internet_before_load=False,
+                                   gui_before_load=False,
+                                   requires_internet=True,
+                                   requires_network=True,
+                                   requires_gui=False,
+                                   no_internet_fallback=True,
+                                   no_network_fallback=True,
+                                   no_gui_fallback=True)
+
+    def speak_dialog(self, key, data=None, *args, **kwargs):
+        with get_metrics().timer("recipes_dialog_seconds", dialog=key):
+            return InstructorSkill.speak_dialog(self, key, data, *args, **kwargs)
+
+    def handle_metrics_request(self, message: Message):
+        """Reply with the collected metrics, as JSON and Prometheus text."""
+        metrics = get_metrics()
+        for name, value in self.recipe_storage.stats().items():
+            metrics.set_gauge("recipes_sessions", value, field=name)
+        cache = get_client().cache
+        if cache:
+            for name, value in cache.stats().items():
+                metrics.set_gauge("recipes_cache", value, field=name)
+        for name, value in get_client().connection_stats().items():
+            metrics.set_gauge("recipes_connections", value, field=name)
+        self.bus.emit(message.response({"enabled": metrics.enabled,
+                                        "metrics": metrics.snapshot(),
+                                        "prometheus": metrics.to_prometheus()}))
+
+    # intent handlers
+    @intent_handler('get.recipe.by.name.intent')
+    @instrumented('recipes_intent_seconds')
+    def handle_search_recipe_by_name(self, message: Message):
+        user = get_message_user(message=message)
+        recipe_data = self._search_in_data_source(search_strategy=execute_search_by_name, message=message)
+        self._after_search(recipe_data=recipe_data, user=user)
+
+    @intent_handler('get.recipe.by.ingredient.intent')
+    @instrumented('recipes_intent_seconds')
+    def handle_search_recipe_by_ingredient(self, message: Message):
+        user = get_message_user(message=message)
+        recipe_data = self._search_in_data_source(search_strategy=execute_search_by_ingredient, message=message)
+        self._after_search(recipe_data=recipe_data, user=user)
+        if recipe_data:
+            self._prefetch_candidates(message)
+
+    @intent_handler('get.random.recipe.intent')
+    @instrumented('recipes_intent_seconds')
+    def handle_search_random(self, message: Message):
+        user = get_message_user(message=message)
+        recipe_data = self.prefetcher.pop(user) or \
+            self._search_in_data_source(search_strategy=execute_search_random, message=message)
+        self._after_search(recipe_data=recipe_data, user=user)
+        self.prefetcher.fill(user, partial(execute_search_random, message))
+
+    @intent_handler('get.the.recipe.name.intent')
+    @instrumented('recipes_intent_seconds')
+    def handle_get_recipe_name(self, message: Message):
+        user = get_message_user(message=message)
+        current_recipe = self.recipe_storage.get_current_recipe(user=user)
+        if current_recipe and current_recipe.name:
+            self.speak_dialog("CurrentRecipe", {"recipe_name": current_recipe.name})
+        else:
+            self.speak_dialog("NoRecipe")
+
+    @intent_handler('recite.the.instructions.intent')
+    @instrumented('recipes_intent_seconds')
+    def handle_recite_instructions(self, message: Message):
+        user = get_message_user(message=message)
+        current_recipe = self.recipe_storage.get_current_recipe(user=user)
+        if not current_recipe:
+            self.speak_dialog("NoRecipe")
+            return
+
+        instructions = current_recipe.steps
+        if instructions:
+            self._start_recitation(user=user, steps=enumerate(instructions),
+                                   message=message)
+        else:
+            self.speak_dialog("NoInstructions")
+
+    @intent_handler('pause.recitation.intent')
+    @instrumented('recipes_intent_seconds')
+    def handle_pause_recitation(self, message: Message):
+        recitation = self._recitations.get(get_message_user(message=message))
+        if recitation:
+            recitation.pause()
+
+    @intent_handler('resume.recitation.intent')
+    @instrumented('recipes_intent_seconds')
+    def handle_resume_recitation(self, message: Message):
+        user = get_message_user(message=message)
+        recitation = self._recitations.get(user)
+        if recitation:
+            recitation.resume()
+            return
+        # the recitation was stopped; continue after the step it stopped at
+        current_recipe = self.recipe_storage.get_current_recipe(user=user)
+        if not current_recipe:
+            self.speak_dialog("NoRecipe")
+            return
+        next_index = current_recipe.get_current_index() + 1
+        if next_index < len(current_recipe.steps):
+            self._start_recitation(
+                user=user, message=message,
+                steps=enumerate(current_recipe.steps[next_index:], next_index))
+        else:
+            self.speak_dialog("NoNextSteps")
+
+    def handle_stop_recitation(self, message: Message):
+        recitation = self._recitations.get(get_message_user(message=message))
+        if recitation:
+            recitation.cancel()
+
+    def stop(self):
+        for recitation in list(self._recitations.values()):
+            recitation.cancel()
+
+    def _on_audio_output_end(self, message: Message):
+        # only the end of a recited step counts: any other speech, even this
+        # skill's own dialogs, would move the recitation ahead of the audio.
+        # Steps whose end is not reported fall back to the recitation timeout
+        key = message.context.get("recipe_recitation")
+        for recitation in list(self._recitations.values()):
+            if key and recitation.key == key:
+                recitation.utterance_finished()
+
+    @intent_handler('get.the.ingredients.intent')
+    @instrumented('recipes_intent_seconds')
+    def handle_get_ingredients(self, message: Message):
+        user = get_message_user(message=message)
+        current_recipe = self.recipe_storage.get_current_recipe(user=user)
+        if not current_recipe:
+            self.speak_dialog("NoRecipe")
+            return
+
+        ingredients = current_recipe.ingredients
+        string_ingredients = self._to_string_ingredients(current_recipe)
+        recipe_name = current_recipe.get(item='strMeal', default='the meal')
+        if ingredients:
+            self.speak_dialog("YouWillNeed", {"recipe_name": recipe_name, "ingredients": string_ingredients})
+        else:
+            self.speak_dialog("NoIngredients")
+
+    @intent_handler('how.much.ingredient.intent')
+    @instrumented('recipes_intent_seconds')
+    def handle_get_ingredient_quantity(self, message: Message):
+        user = get_message_user(message=message)
+        current_recipe = self.recipe_storage.get_current_recipe(user=user)
+        if not current_recipe:
+            self.speak_dialog("NoRecipe")
+            return
+
+        requested = message.data.get("ingredient")
+        ingredient = current_recipe.find_ingredient(requested)
+        if not ingredient:
+            recipe_name = current_recipe.get(item='strMeal', default='the meal')
+            self.speak_dialog("IngredientNotUsed", {"recipe_name": recipe_name, "ingredient": requested})
+            return
+        quantity = adjust(current_recipe.get_quantity(ingredient),
+                          self.unit_system, self.servings_scale)
+        if quantity.amount is None and not quantity.note:
+            self.speak_dialog("IngredientNotMeasured", {"ingredient": ingredient})
+        elif quantity.unit:
+            if quantity.note:
+                ingredient = f"{ingredient}, {quantity.note.lower()}"
+            self.speak_dialog("IngredientQuantity", {"quantity": to_spoken(quantity._replace(note='')),
+                                                     "ingredient": ingredient})
+        else:
+            self.speak_dialog("IngredientAmount", {"amount": describe(ingredient, quantity)})
+
+    @intent_handler('get.the.current.step.intent')
+    @instrumented('recipes_intent_seconds')
+    def handle_get_current_step(self, message: Message):
+        user = get_message_user(message=message)
+        current_recipe = self.recipe_storage.get_current_recipe(user=user)
+        if not current_recipe:
+            self.speak_dialog("NoRecipe")
+            return
+        current_index = current_recipe.get_current_index()
+
+        step = current_recipe.get_step(current_index)
+        recipe_name = current_recipe.get(item='strMeal', default='the meal')
+        if step is not None:
+            self.speak_dialog("CurrentStep", {"recipe_name": recipe_name,
+                                              "step": step})
+        else:  # the instruction list is empty
+            self.speak_dialog("NoInstructions")
+
+    @intent_handler('get.the.previous.step.intent')
+    @instrumented('recipes_intent_seconds')
+    def handle_get_previous_step(self, message: Message):
+        user = get_message_user(message=message)
+        with self.recipe_storage.user_lock(user):
+            current_recipe = self.recipe_storage.get_current_recipe(user=user)
+            if not current_recipe:
+                self.speak_dialog("NoRecipe")
+                return
+            current_index = current_recipe.get_current_index()
+
+            previous_index = current_index - 1
+            recipe_name = current_recipe.get(item='strMeal', default='the meal')
+            if current_index > 0:
+                self.speak_dialog("PreviousStep", {"recipe_name": recipe_name,
+                                                   "step": current_recipe.steps[previous_index]})
+                self.recipe_storage.update_current_index(user=user, new_index=previous_index)
+            else:
+                self.speak_dialog("NoPreviousStep")
+
+    @intent_handler('get.the.next.step.intent')
+    @instrumented('recipes_intent_seconds')
+    def handle_get_next_step(self, message: Message):
+        user = get_message_user(message=message)
+        with self.recipe_storage.user_lock(user):
+            current_recipe = self.recipe_storage.get_current_recipe(user=user)
+            if not current_recipe:
+                self.speak_dialog("NoRecipe")
+                return
+            current_index = current_recipe.get_current_index()
+
+            next_index = current_index + 1
+            if next_index < len(current_recipe.steps):
+                self.speak_dialog("NextStep", {"recipe_name": current_recipe.name,
+                                               "step": current_recipe.steps[next_index]})
+                self.recipe_storage.update_current_index(user=user, new_index=next_index)
+            else:
+                self.speak_dialog("NoNextSteps")
+
+    # defining abstract methods
+    def _access_data_source(self) -> MultiSource:
+        """
+        Set up the sources recipes are searched in: the local index, the
+        response cache, TheMealDB and any configured mirrors of it
+        :return: the sources shared by all search strategies
+        """
+        def limiter():
+            return TokenBucket(rate=self.settings.get("api_rate_limit", 2.0),
+                               capacity=self.settings.get("api_burst", 10))
+
+        api_key = self.settings.get("api_key") or API_KEY
+        # the HTTP session is only created on the first request
+        set_client(MealDBClient(
+            base_url=self.settings.get("api_url") or API_URL_TEMPLATE.format(api_key),
+            limiter=limiter()))
+        mirrors = [MealDBClient(base_url=url, limiter=limiter())
+                   for url in self.settings.get("mirror_urls") or []]
+        set_sources(MultiSource(default_sources(
+            mirrors, self.settings.get("api_deadline", 5.0))))
+        return get_sources()
+
+    def _search_in_data_source(self, search_strategy, message: Message):
+        """
+        Run a search strategy against the data sources
+        :param search_strategy: one of the execute_search_* functions
+        :param message: a Message object associated with the request
+        :return: recipe data from the first source that has it, None if none does
+        """
+        return search_strategy(message)
+
+    @staticmethod
+    def _get_instructions(recipe: dict) -> list:
+        """
+        Get recipe steps
+        :param recipe: a dict with all the info about the recipe
+        :return: a list with recipe steps
+        """
+        return list(parse_instructions(recipe.get("strInstructions", "")))
+
+    # static utility methods
+    @staticmethod
+    def _get_ingredients(recipe: dict) -> dict:
+        """
+        Get ingredients from recipe
+        :param recipe: a dict with all the info about the recipe
+        :return: a dict with ingredient-quantity and key-value pairs
+        """
+        return dict(parse_ingredients(recipe))
+
+    def _to_string_ingredients(self, recipe: Recipe) -> Optional[str]:
+        """Make the ingredients of a recipe and their quantities into a string."""
+        substrings = [describe(ingredient,
+                               adjust(quantity, self.unit_system,
+                                      self.servings_scale))
+                      for (ingredient, _), quantity
+                      in zip(recipe.ingredients, recipe.quantities)]
+        return ', '.join(substrings) if substrings else None
+
+    # other utilities
+    def _create_new_recipe(self, recipe_data: dict, user: str) -> Recipe:
+        """Create a new recipe with side effects."""
+        # TODO: consider using recipe manager to store a queue of recipes
+        with get_metrics().timer("recipes_parse_seconds"):
+            recipe = as_recipe(recipe_data)
+        # the steps of the previous recipe must not move the new one
+        self._cancel_recitation(user)
+        self.recipe_storage.assign_recipe(user=user, recipe=recipe)
+        return recipe
+
+    def _prefetch_candidates(self, message: Message):
+        """Warm the cache with the recipes a repeated ingredient search returns."""
+        cache = get_client().cache
+        meal_ids = [meal_id for meal_id in
+                    upcoming_ingredient_candidates(message.data.get("ingredient"),
+                                                   get_message_user(message),
+                                                   self.prefetcher.queue_size)
+                    if meal_id not in get_index() and
+                    not (cache and cache.contains(LOOKUP, {'i': meal_id}))]
+        self.prefetcher.warm(partial(lookup_recipe, meal_id) for meal_id in meal_ids)
+
+    def _load_data(self):
+        """Load the response cache and local recipes, then warm them up."""
+        start = time.monotonic()
+        try:
+            cache_path = join(self.file_system.path, "response_cache.sqlite") \
+                if self.settings.get("persist_cache", True) else None
+            get_client().cache = ResponseCache(
+                max_entries=self.settings.get("cache_size", 512),
+                path=cache_path)
+            # mirrors serve the same data, so their responses share the cache
+            for source in get_sources().sources:
+                if isinstance(source, MealDBSource):
+                    source.client.cache = get_client().cache
+            index_path = self.settings.get("local_recipes") or \
+                join(self.file_system.path, "recipes.json")
+            if isfile(index_path):
+                get_index().load(index_path)
+            get_titles().add_meals(get_index().meals())
+            if self.settings.get("index_titles", True):
+                self._index_titles()
+            self._warm_up()
+        except Exception as e:
+            LOG.error(f"Loading recipe data failed: {e}")
+        LOG.info(f"Recipe data loaded in {time.monotonic() - start:.2f}s")
+
+    def _index_titles(self):
+        """Learn the titles of all recipes from the API's by-letter listing."""
+        cache = get_client().cache
+        missing = []
+        for letter in ascii_lowercase:
+            if cache and cache.contains(SEARCH, {'f': letter}):
+                index_titles_by_letter(letter)
+            else:
+                missing.append(letter)
+        self.prefetcher.warm(partial(index_titles_by_letter, letter)
+                             for letter in missing)
+
+    def _warm_up(self):
+        """Refresh the most requested queries of past runs in the background."""
+        client = get_client()
+        queries = [(endpoint, params) for endpoint, params in
+                   client.cache.popular(self.settings.get("warmup_queries", 10))
+                   if not client.cache.contains(endpoint, params)]
+        self.prefetcher.warm(partial(client.get_json, endpoint, params)
+                             for endpoint, params in queries)
+
+    def _cancel_recitation(self, user: str):
+        """Stop and forget the recitation of a user, if one is running."""
+        recitation = self._recitations.pop(user, None)
+        if recitation:
+            recitation.cancel()
+
+    def _start_recitation(self, user: str, steps, message: Message):
+        """Recite steps in the background, replacing any running recitation."""
+        self._cancel_recitation(user)
+
+        def on_step(index):
+            # a step may still end after the recitation was replaced
+            if self._recitations.get(user) is recitation:
+                self.recipe_storage.update_current_index(user=user,
+                                                         new_index=index)
+
+        def on_done():
+            if self._recitations.get(user) is recitation:
+                del self._recitations[user]
+
+        key = uuid4().hex
+        # the audio service keeps the context of a spoken message in its
+        # end-of-speech event, which tells the steps apart from other speech
+        step_message = Message(message.msg_type, message.data,
+                               {**message.context, "recipe_recitation": key})
+        recitation = Recitation(
+            steps=steps,
+            speak=lambda step: self.speak_dialog("ReciteStep", {"step": step},
+                                                 message=step_message),
+            on_step=on_step,
+            on_done=on_done,
+            key=key)
+        self._recitations[user] = recitation
+        recitation.start()
+
+    def _after_search(self, recipe_data: dict, user: str):
+        """A set of statements to execute after searching."""
+        if recipe_data:
+            recipe = self._create_new_recipe(recipe_data=recipe_data, user=user)
+            string_ingredients = self._to_string_ingredients(recipe)
+            recipe_name = recipe.get('strMeal', 'the meal')
+            self.speak_dialog("YouWillNeed",
+                              {"recipe_name": recipe_name,
+                               "ingredients": string_ingredients})
+        else:
+            self.speak_dialog("SearchFailed")
@@ -0,0 +1,333 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Compact, memory-mappable snapshot of a recipe corpus.
+
+Recipes are stored already parsed: steps and ingredient quantities are
+arrays of fixed-size records referring to one table of deduplicated UTF-8
+strings, so the empty strIngredientN/strMeasureN slots, URLs and tags of the
+API payload are not kept. The file is read through `mmap`, so skill
+processes on one device share a single copy in the page cache. Layout, all
+little-endian:
+
+    header        _HEADER
+    string index  u32 offsets into the string data, one per string plus one
+    string data   UTF-8
+    recipes       _RECIPE records (string ids of idMeal, strMeal, strCategory
+                  and strArea, then the first step and ingredient and their
+                  counts)
+    steps         u32 string ids
+    ingredients   _INGREDIENT records (string ids of the ingredient, measure,
+                  unit and note, then amount and amount_max, NaN for None)
+
+Convert a TheMealDB JSON dump with:
+
+    python -m skill_recipes.snapshot recipes.json recipes.snapshot
+"""
+
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+from sys import intern
+from typing import Iterable, Iterator, List, Optional
+
+from .quantities import Quantity
+from .recipe_utils import Recipe
+
+MAGIC = b'RCPS'
+VERSION = 1
+NONE = 0xFFFFFFFF
+
+_HEADER = struct.Struct('<4sHHIIII5Q')
+_U32 = struct.Struct('<I')
+_RECIPE = struct.Struct('<8I')
+_INGREDIENT = struct.Struct('<4I2d')
+
+
+class _StringTable:
+
+    def __init__(self):
+        self.ids = {}
+        self.strings = []
+
+    def add(self, value: Optional[str]) -> int:
+        if value is None:
+            return NONE
+        string_id = self.ids.get(value)
+        if string_id is None:
+            string_id = self.ids[value] = len(self.strings)
+            self.strings.append(value)
+        return string_id
+
+
+def _pad(data: bytearray) -> None:
+    """Align the next section to 8 bytes."""
+    data.extend(b'\0' * (-len(data) % 8))
+
+
+def _amount(value: Optional[float]) -> float:
+    return math.nan if value is None else value
+
+
+def write_snapshot(recipes: Iterable[dict], path: str) -> int:
+    """Convert TheMealDB-format recipes into a snapshot file.
+
+    The file is written next to `path` and moved into place, so processes
+    that have the previous snapshot mapped keep a consistent copy.
+
+    Args:
+        recipes (Iterable[dict]): recipes as returned by the API
+        path (str): the snapshot file to write
+
+    Returns:
+        int: number of recipes written
+
+    """
+    strings = _StringTable()
+    records = bytearray()
+    steps = bytearray()
+    ingredients = bytearray()
+    step_count = ingredient_count = recipe_count = 0
+    for recipe_data in recipes:
+        if not recipe_data.get('idMeal'):
+            continue
+        recipe = Recipe(recipe_data)
+        records += _RECIPE.pack(
+            strings.add(recipe.recipe_id), strings.add(recipe.name),
+            strings.add(recipe.category), strings.add(recipe.area),
+            step_count, len(recipe.steps),
+            ingredient_count, len(recipe.ingredients))
+        for step in recipe.steps:
+            steps += _U32.pack(strings.add(step))
+        for (ingredient, measure), quantity in zip(recipe.ingredients,
+                                                   recipe.quantities):
+            ingredients += _INGREDIENT.pack(
+                strings.add(ingredient), strings.add(measure),
+                strings.add(quantity.unit), strings.add(quantity.note),
+                _amount(quantity.amount), _amount(quantity.amount_max))
+        step_count += len(recipe.steps)
+        ingredient_count += len(recipe.ingredients)
+        recipe_count += 1
+
+    encoded = [string.encode('utf-8') for string in strings.strings]
+    string_index = bytearray()
+    offset = 0
+    for data in encoded:
+        string_index += _U32.pack(offset)
+        offset += len(data)
+    string_index += _U32.pack(offset)
+
+    body = bytearray(_HEADER.size)
+    _pad(body)
+    offsets = []
+    for section in (string_index, b''.join(encoded), records, steps,
+                    ingredients):
+        offsets.append(len(body))
+        body += section
+        _pad(body)
+    _HEADER.pack_into(body, 0, MAGIC, VERSION, 0, len(encoded), recipe_count,
+                      step_count, ingredient_count, *offsets)
+
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(body)
+    os.replace(temp_path, path)
+    return recipe_count
+
+
+def is_snapshot(path: str) -> bool:
+    """Check if a file is a recipe snapshot rather than a JSON dump."""
+    with open(path, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+class Snapshot:
+
+    def __init__(self, path: str):
+        """Read-only view of a snapshot file.
+
+        Nothing is decoded up front but the recipe ids; recipes are built
+        from the mapped file on request.
+
+        Args:
+            path (str): the snapshot file
+
+        Raises:
+            ValueError: if the file is not a snapshot of a supported version
+        """
+        self.path = path
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            (magic, version, _, self._string_count, self._recipe_count,
+             self._step_count, self._ingredient_count, self._string_index,
+             self._string_data, self._recipes, self._steps,
+             self._ingredients) = _HEADER.unpack_from(self._map, 0)
+        except struct.error:
+            magic = version = None
+        if magic != MAGIC or version != VERSION:
+            self._map.close()
+            raise ValueError(f"{path} is not a version {VERSION} "
+                             f"recipe snapshot")
+        self._positions = {self._string(self._record(i)[0]): i
+                           for i in range(self._recipe_count)}
+
+    def __len__(self) -> int:
+        return self._recipe_count
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the recipe ids."""
+        return iter(self._positions)
+
+    def __contains__(self, meal_id: str) -> bool:
+        return meal_id in self._positions
+
+    def __enter__(self) -> 'Snapshot':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def recipe(self, meal_id: str) -> Optional[Recipe]:
+        """Build a recipe without going through the API payload format.
+
+        Args:
+            meal_id (str): TheMealDB recipe id
+
+        Returns:
+            Recipe: the recipe, None if the snapshot does not have it
+
+        """
+        position = self._positions.get(meal_id)
+        if position is None:
+            return None
+        (recipe_id, name, category, area, first_step, step_count,
+         first_ingredient, ingredient_count) = self._record(position)
+        ingredients = []
+        quantities = []
+        for i in range(first_ingredient, first_ingredient + ingredient_count):
+            ingredient, measure, unit, note, amount, amount_max = \
+                _INGREDIENT.unpack_from(self._map, self._ingredients +
+                                        i * _INGREDIENT.size)
+            ingredients.append((self._string(ingredient, True),
+                                self._string(measure)))
+            quantities.append(Quantity(
+                None if math.isnan(amount) else amount,
+                self._string(unit, True), self._string(note),
+                None if math.isnan(amount_max) else amount_max))
+        return Recipe.from_fields(
+            self._string(recipe_id), self._string(name),
+            self._string(category, True), self._string(area, True),
+            tuple(self._string(self._step(i))
+                  for i in range(first_step, first_step + step_count)),
+            tuple(ingredients), quantities)
+
+    def summary(self, meal_id: str) -> Optional[dict]:
+        """Get the searchable fields of a recipe without building it.
+
+        Args:
+            meal_id (str): TheMealDB recipe id
+
+        Returns:
+            dict: idMeal, strMeal, strCategory, strArea and strIngredientN
+                values, None if the snapshot does not have the recipe
+
+        """
+        position = self._positions.get(meal_id)
+        if position is None:
+            return None
+        (recipe_id, name, category, area, _, _, first_ingredient,
+         ingredient_count) = self._record(position)
+        summary = {'idMeal': self._string(recipe_id),
+                   'strMeal': self._string(name),
+                   'strCategory': self._string(category, True),
+                   'strArea': self._string(area, True)}
+        for i in range(ingredient_count):
+            ingredient = _U32.unpack_from(
+                self._map, self._ingredients +
+                (first_ingredient + i) * _INGREDIENT.size)[0]
+            summary['strIngredient' + str(i + 1)] = \
+                self._string(ingredient, True)
+        return summary
+
+    def recipe_data(self, meal_id: str) -> Optional[dict]:
+        """Get a recipe in the TheMealDB format, with only its used keys.
+
+        Args:
+            meal_id (str): TheMealDB recipe id
+
+        Returns:
+            dict: recipe data, None if the snapshot does not have it
+
+        """
+        recipe = self.recipe(meal_id)
+        return recipe.to_dict() if recipe else None
+
+    def close(self) -> None:
+        self._map.close()
+
+    def _record(self, position: int) -> tuple:
+        return _RECIPE.unpack_from(self._map,
+                                   self._recipes + position * _RECIPE.size)
+
+    def _step(self, position: int) -> int:
+        return _U32.unpack_from(self._map,
+                                self._steps + position * _U32.size)[0]
+
+    def _string(self, string_id: int, shared: bool = False) -> Optional[str]:
+        """Decode a string; `shared` ones (names, units) are interned."""
+        if string_id == NONE:
+            return None
+        start, end = struct.unpack_from(
+            '<2I', self._map, self._string_index + string_id * _U32.size)
+        value = self._map[self._string_data + start:
+                          self._string_data + end].decode('utf-8')
+        return intern(value) if shared else value
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = sys.argv[1:] if argv is None else argv
+    if len(args) != 2:
+        sys.exit("usage: python -m skill_recipes.snapshot "
+                 "<recipes.json> <recipes.snapshot>")
+    source, target = args
+    with open(source, encoding='utf-8') as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get('meals') or []
+    count = write_snapshot(data, target)
+    print(f"Wrote {count} recipes to {target} "
+          f"({os.path.getsize(target):,} bytes, "
+          f"{os.path.getsize(source):,} bytes of JSON)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,295 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import sys
+import threading
+import time
+import unittest
+from os.path import dirname
+
+sys.path.append(dirname(dirname(__file__)))
+
+from benchmarks.common import load_corpus, unlimited
+from benchmarks.fake_mealdb import FakeMealDB
+from skill_recipes.api_client import LOOKUP, SEARCH, CircuitBreaker, \
+    MealDBClient, TokenBucket, background_requests
+
+
+class TestRequestCoalescing(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        # slow enough that every caller arrives while the first one waits
+        cls.fake = FakeMealDB(load_corpus(), latency=0.2).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.fake.stop()
+
+    def setUp(self):
+        self.fake.reset()
+        self.client = MealDBClient(self.fake.url, limiter=unlimited())
+
+    def tearDown(self):
+        self.client.close()
+
+    def burst(self, params_of, callers: int = 20) -> list:
+        barrier = threading.Barrier(callers)
+        results = [None] * callers
+
+        def call(i):
+            barrier.wait()
+            results[i] = self.client.get_json(SEARCH, params_of(i))
+
+        threads = [threading.Thread(target=call, args=(i,))
+                   for i in range(callers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_concurrent_callers_share_one_request(self):
+        results = self.burst(lambda i: {'s': 'chicken'})
+        self.assertEqual(self.fake.requests, 1)
+        self.assertIsNotNone(results[0])
+        self.assertTrue(all(result == results[0] for result in results))
+        self.assertEqual(self.client.stats.snapshot()['coalesced'],
+                         len(results) - 1)
+
+    def test_equivalent_params_share_one_request(self):
+        results = self.burst(lambda i: {'s': 'CHICKEN' if i % 2 else 'chicken'})
+        self.assertEqual(self.fake.requests, 1)
+        self.assertTrue(all(result == results[0] for result in results))
+
+    def test_different_queries_are_not_coalesced(self):
+        self.burst(lambda i: {'s': 'chicken' if i % 2 else 'beef'}, callers=10)
+        self.assertEqual(self.fake.requests, 2)
+
+    def test_interactive_caller_retries_throttled_background_flight(self):
+        entered = threading.Event()
+        release = threading.Event()
+
+        class GatedBucket(TokenBucket):
+            def acquire(self, background=False, wait=False):
+                if not background:
+                    return True
+                # throttled, but only once the interactive caller waits
+                entered.set()
+                release.wait()
+                return False
+
+        self.client.limiter = GatedBucket()
+        results = {}
+
+        def prefetch():
+            with background_requests():
+                results['background'] = self.client.get_json(
+                    SEARCH, {'s': 'chicken'})
+
+        background = threading.Thread(target=prefetch)
+        background.start()
+        entered.wait()
+        interactive = threading.Thread(target=lambda: results.update(
+            interactive=self.client.get_json(SEARCH, {'s': 'chicken'})))
+        interactive.start()
+        while not self.client.stats.snapshot()['coalesced']:
+            time.sleep(0.001)
+        release.set()
+        background.join()
+        interactive.join()
+        self.assertIsNone(results['background'])
+        self.assertIsNotNone(results['interactive'])
+        self.assertEqual(self.fake.requests, 1)
+
+
+class TestTokenBucket(unittest.TestCase):
+
+    def setUp(self):
+        self.bucket = TokenBucket(rate=20.0, capacity=4, reserve=0.5,
+                                  max_wait=1.0)
+        # one token left: below the reserve kept for interactive calls
+        for _ in range(3):
+            self.assertTrue(self.bucket.acquire())
+
+    def test_background_call_leaves_reserve(self):
+        self.assertFalse(self.bucket.acquire(background=True))
+        self.assertTrue(self.bucket.acquire())
+
+    def test_waiting_background_call_gets_token(self):
+        start = time.monotonic()
+        self.assertTrue(self.bucket.acquire(background=True, wait=True))
+        # it waited until the bucket was back above the reserve
+        self.assertGreater(time.monotonic() - start, 0.05)
+
+    def test_waiting_is_bounded_by_max_wait(self):
+        self.bucket.rate = 0.1
+        self.bucket.max_wait = 0.05
+        self.assertFalse(self.bucket.acquire(background=True, wait=True))
+
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    def setUp(self):
+        self.breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+
+    def open_breaker(self):
+        for _ in range(self.breaker.failure_threshold):
+            self.breaker.record_failure()
+
+    def test_opens_after_threshold(self):
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, "closed")
+        self.assertTrue(self.breaker.allow_request())
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, "open")
+        self.assertFalse(self.breaker.allow_request())
+
+    def test_success_resets_failure_count(self):
+        self.breaker.record_failure()
+        self.breaker.record_success()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, "closed")
+
+    def test_half_open_lets_one_trial_through(self):
+        self.open_breaker()
+        time.sleep(0.06)
+        self.assertEqual(self.breaker.state, "half-open")
+        self.assertTrue(self.breaker.allow_request())
+        self.assertFalse(self.breaker.allow_request())
+
+    def test_successful_trial_closes(self):
+        self.open_breaker()
+        time.sleep(0.06)
+        self.assertTrue(self.breaker.allow_request())
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, "closed")
+        self.assertEqual(self.breaker.failures, 0)
+        self.assertTrue(self.breaker.allow_request())
+
+    def test_failed_trial_reopens(self):
+        self.open_breaker()
+        time.sleep(0.06)
+        self.assertTrue(self.breaker.allow_request())
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, "open")
+        self.assertFalse(self.breaker.allow_request())
+
+
+class TestRetries(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.meals = load_corpus()
+        cls.fake = FakeMealDB(cls.meals).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.fake.stop()
+
+    def setUp(self):
+        self.fake.reset()
+        self.fake.latency = 0.0
+        self.client = MealDBClient(self.fake.url, max_retries=2,
+                                   backoff_base=0.001, backoff_cap=0.01,
+                                   limiter=unlimited())
+        self.params = {'i': self.meals[0]['idMeal']}
+
+    def tearDown(self):
+        self.client.close()
+
+    def test_retries_transient_status(self):
+        for status in (429, 500, 502, 503, 504):
+            self.fake.reset()
+            self.fake.statuses = [status, status]
+            data = self.client.get_json(LOOKUP, self.params)
+            self.assertEqual(data['meals'][0]['idMeal'], self.params['i'])
+            self.assertEqual(self.fake.requests, 3)
+        self.assertEqual(self.client.stats.snapshot()['retries'], 10)
+        self.assertEqual(self.client.breaker.state, "closed")
+
+    def test_gives_up_after_max_retries(self):
+        self.fake.statuses = [503] * 5
+        self.assertIsNone(self.client.get_json(LOOKUP, self.params))
+        self.assertEqual(self.fake.requests, 3)
+        stats = self.client.stats.snapshot()
+        self.assertEqual(stats['failures'], 1)
+        self.assertEqual(stats['status_codes'], {503: 3})
+        self.assertEqual(self.client.breaker.failures, 1)
+
+    def test_client_error_is_not_retried(self):
+        self.fake.statuses = [404]
+        self.assertIsNone(self.client.get_json(LOOKUP, self.params))
+        self.assertEqual(self.fake.requests, 1)
+        self.assertEqual(self.client.stats.snapshot()['retries'], 0)
+        # the upstream answered, so the breaker does not count it
+        self.assertEqual(self.client.breaker.failures, 0)
+
+    def test_backoff_is_capped_full_jitter(self):
+        client = MealDBClient(self.fake.url, backoff_base=0.25, backoff_cap=2.0)
+        for attempt in range(1, 6):
+            limit = min(2.0, 0.25 * 2 ** attempt)
+            delays = [client._backoff(attempt) for _ in range(200)]
+            self.assertTrue(all(0 <= delay <= limit for delay in delays))
+            self.assertGreater(max(delays), limit / 2)
+
+    def test_open_breaker_skips_upstream(self):
+        self.client.max_retries = 0
+        self.client.breaker = CircuitBreaker(failure_threshold=2,
+                                             reset_timeout=0.2)
+        self.fake.statuses = [500, 500]
+        self.assertIsNone(self.client.get_json(LOOKUP, self.params))
+        self.assertIsNone(self.client.get_json(LOOKUP, self.params))
+        self.assertEqual(self.client.breaker.state, "open")
+        self.assertIsNone(self.client.get_json(LOOKUP, self.params))
+        self.assertEqual(self.fake.requests, 2)
+        self.assertEqual(self.client.stats.snapshot()['rejected'], 1)
+        time.sleep(0.25)
+        self.assertIsNotNone(self.client.get_json(LOOKUP, self.params))
+        self.assertEqual(self.fake.requests, 3)
+        self.assertEqual(self.client.breaker.state, "closed")
+
+    def test_timeout_counts_as_failure(self):
+        self.fake.latency = 0.3
+        client = MealDBClient(self.fake.url, read_timeout=0.05, max_retries=1,
+                              backoff_base=0.001, limiter=unlimited())
+        start = time.monotonic()
+        self.assertIsNone(client.get_json(LOOKUP, self.params))
+        self.assertLess(time.monotonic() - start, 0.3)
+        self.assertEqual(self.fake.requests, 2)
+        stats = client.stats.snapshot()
+        self.assertEqual(stats['retries'], 1)
+        self.assertEqual(stats['failures'], 1)
+        # no response at all
+        self.assertEqual(stats['status_codes'], {None: 2})
+        self.assertEqual(client.breaker.failures, 1)
+        client.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
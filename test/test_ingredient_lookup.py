@@ -0,0 +1,87 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import unittest
+
+from skill_recipes.ingredient_lookup import IngredientLookup, normalize, \
+    singularize
+
+
+class TestNormalize(unittest.TestCase):
+
+    def test_singularize(self):
+        for plural, singular in (("tomatoes", "tomato"), ("berries", "berry"),
+                                 ("leaves", "leaf"), ("peaches", "peach"),
+                                 ("eggs", "egg"), ("peas", "pea")):
+            self.assertEqual(singularize(plural), singular)
+        for word in ("couscous", "asparagus", "glass", "egg", "oil"):
+            self.assertEqual(singularize(word), word)
+
+    def test_normalize(self):
+        self.assertEqual(normalize("Free-Range Eggs"), "free range egg")
+        self.assertEqual(normalize(None), "")
+
+
+class TestIngredientLookup(unittest.TestCase):
+
+    def setUp(self):
+        self.lookup = IngredientLookup(["Plain Flour", "Chopped Tomatoes",
+                                        "Tomato Puree", "Eggs", "Olive Oil",
+                                        "Soy Sauce", "Red Pepper"])
+
+    def test_exact_name(self):
+        self.assertEqual(self.lookup.find("olive oil"), "Olive Oil")
+        self.assertEqual(self.lookup.find("Tomato Puree"), "Tomato Puree")
+
+    def test_plural_and_case(self):
+        self.assertEqual(self.lookup.find("EGG"), "Eggs")
+        self.assertEqual(self.lookup.find("chopped tomato"), "Chopped Tomatoes")
+
+    def test_single_word_finds_noun_first(self):
+        self.assertEqual(self.lookup.find("flour"), "Plain Flour")
+        self.assertEqual(self.lookup.find("tomatoes"), "Chopped Tomatoes")
+        self.assertEqual(self.lookup.find("puree"), "Tomato Puree")
+
+    def test_misheard_name(self):
+        self.assertEqual(self.lookup.find("plain flower"), "Plain Flour")
+
+    def test_every_word_must_match(self):
+        self.assertEqual(self.lookup.find("the red pepper"), "Red Pepper")
+        lookup = IngredientLookup(["Vegetable Oil", "Soy Sauce", "Red Pepper"])
+        self.assertIsNone(lookup.find("olive oil"))
+        self.assertIsNone(lookup.find("fish sauce"))
+        self.assertIsNone(lookup.find("green pepper"))
+
+    def test_not_used(self):
+        self.assertIsNone(self.lookup.find("butter"))
+        self.assertIsNone(self.lookup.find(""))
+        self.assertIsNone(self.lookup.find(None))
+
+
+if __name__ == '__main__':
+    unittest.main()
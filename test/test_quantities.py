@@ -0,0 +1,152 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import unittest
+
+from skill_recipes.quantities import Quantity, adjust, convert, describe, \
+    parse_quantity, to_spoken
+
+
+class TestParseQuantity(unittest.TestCase):
+
+    def test_amount_and_unit(self):
+        self.assertEqual(parse_quantity("500g"), Quantity(500.0, 'g'))
+        self.assertEqual(parse_quantity("200ml milk"),
+                         Quantity(200.0, 'ml', 'milk'))
+        self.assertEqual(parse_quantity("2 cloves chopped"),
+                         Quantity(2.0, 'clove', 'chopped'))
+
+    def test_fractions(self):
+        self.assertEqual(parse_quantity("1 1/2 cups"), Quantity(1.5, 'cup'))
+        self.assertEqual(parse_quantity("½ tsp"), Quantity(0.5, 'tsp'))
+        self.assertEqual(parse_quantity("1½ cups"), Quantity(1.5, 'cup'))
+
+    def test_decimal_comma(self):
+        self.assertEqual(parse_quantity("1,5 kg"), Quantity(1.5, 'kg'))
+        self.assertEqual(parse_quantity("12,34 g"), Quantity(12.34, 'g'))
+
+    def test_thousands_separator(self):
+        self.assertEqual(parse_quantity("1,000 g"), Quantity(1000.0, 'g'))
+        self.assertEqual(parse_quantity("1,000,000 g"),
+                         Quantity(1000000.0, 'g'))
+        self.assertEqual(parse_quantity("2,500-3,000 ml"),
+                         Quantity(2500.0, 'ml', '', 3000.0))
+
+    def test_ranges(self):
+        self.assertEqual(parse_quantity("2-3 tbsp"),
+                         Quantity(2.0, 'tbsp', '', 3.0))
+        self.assertEqual(parse_quantity("1 to 2 lbs"),
+                         Quantity(1.0, 'lb', '', 2.0))
+
+    def test_spoon_aliases_are_case_sensitive(self):
+        self.assertEqual(parse_quantity("1 T").unit, 'tbsp')
+        self.assertEqual(parse_quantity("1 t").unit, 'tsp')
+
+    def test_count_without_unit(self):
+        self.assertEqual(parse_quantity("3 large"),
+                         Quantity(3.0, None, 'large'))
+        self.assertEqual(parse_quantity("pinch"), Quantity(1.0, 'pinch'))
+
+    def test_no_amount(self):
+        self.assertEqual(parse_quantity("to taste"),
+                         Quantity(None, None, 'to taste'))
+        self.assertEqual(parse_quantity(""), Quantity(None, None))
+        self.assertEqual(parse_quantity(None), Quantity(None, None))
+
+    def test_zero_denominator(self):
+        self.assertEqual(parse_quantity("1/0"), Quantity(None, None, '1/0'))
+
+
+class TestConvert(unittest.TestCase):
+
+    def test_to_metric(self):
+        self.assertAlmostEqual(convert(Quantity(2, 'cup'), 'metric').amount,
+                               473.176)
+        self.assertEqual(convert(Quantity(8, 'oz'), 'metric').unit, 'g')
+
+    def test_to_imperial_uses_largest_unit_above_one(self):
+        quantity = convert(Quantity(1000, 'g'), 'imperial')
+        self.assertEqual(quantity.unit, 'lb')
+        self.assertAlmostEqual(quantity.amount, 2.2046, places=3)
+        self.assertEqual(convert(Quantity(100, 'g'), 'imperial').unit, 'oz')
+
+    def test_range_is_converted(self):
+        quantity = convert(Quantity(1, 'cup', '', 2), 'metric')
+        self.assertAlmostEqual(quantity.amount_max, 473.176)
+
+    def test_unchanged(self):
+        for quantity in (Quantity(500, 'g'), Quantity(1, 'tsp'),
+                         Quantity(2, 'clove'), Quantity(3, None, 'large'),
+                         Quantity(None, None, 'to taste')):
+            self.assertEqual(convert(quantity, 'metric'), quantity)
+        self.assertEqual(convert(Quantity(1, 'cup'), 'unknown'),
+                         Quantity(1, 'cup'))
+
+    def test_adjust_scales_then_converts(self):
+        quantity = adjust(Quantity(1, 'cup', '', 2), 'metric', 2)
+        self.assertEqual(quantity.unit, 'ml')
+        self.assertAlmostEqual(quantity.amount, 473.176)
+        self.assertAlmostEqual(quantity.amount_max, 946.352)
+
+
+class TestToSpoken(unittest.TestCase):
+
+    def test_fractions(self):
+        self.assertEqual(to_spoken(Quantity(1.5, 'cup')), "1 and a half cups")
+        self.assertEqual(to_spoken(Quantity(0.5, 'cup')), "half a cup")
+        self.assertEqual(to_spoken(Quantity(0.25, 'tsp')),
+                         "a quarter of a teaspoon")
+
+    def test_singular_and_plural(self):
+        self.assertEqual(to_spoken(Quantity(1, 'cup')), "1 cup")
+        self.assertEqual(to_spoken(Quantity(12.4, 'g')), "12 grams")
+
+    def test_range(self):
+        self.assertEqual(to_spoken(Quantity(2, 'tbsp', '', 3)),
+                         "2 to 3 tablespoons")
+
+    def test_note(self):
+        self.assertEqual(to_spoken(Quantity(250, 'g', 'sifted')),
+                         "250 grams sifted")
+        self.assertEqual(to_spoken(Quantity(3, None, 'free-range')),
+                         "3 free-range")
+        self.assertEqual(to_spoken(Quantity(None, None, 'to taste')),
+                         "to taste")
+        self.assertIsNone(to_spoken(Quantity(None, None)))
+
+    def test_describe(self):
+        self.assertEqual(describe("flour", Quantity(2, 'cup')),
+                         "2 cups of flour")
+        self.assertEqual(describe("eggs", Quantity(3, None, 'free-range')),
+                         "3 free-range eggs")
+        self.assertEqual(describe("salt", Quantity(None, None, 'To taste')),
+                         "salt, to taste")
+
+
+if __name__ == '__main__':
+    unittest.main()
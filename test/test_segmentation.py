@@ -0,0 +1,68 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import json
+import unittest
+from os.path import dirname, join
+
+from skill_recipes.segmentation import iter_steps
+
+CORPUS_PATH = join(dirname(dirname(__file__)), 'benchmarks', 'corpus',
+                   'segmentation.json')
+
+
+class TestIterSteps(unittest.TestCase):
+
+    def test_labelled_corpus(self):
+        with open(CORPUS_PATH, encoding='utf-8') as f:
+            cases = json.load(f)
+        for case in cases:
+            with self.subTest(text=case['text'][:40]):
+                self.assertEqual(list(iter_steps(case['text'])), case['steps'])
+
+    def test_empty(self):
+        self.assertEqual(list(iter_steps(None)), [])
+        self.assertEqual(list(iter_steps("")), [])
+        self.assertEqual(list(iter_steps("\r\n\r\n")), [])
+
+    def test_enumerators_are_dropped(self):
+        self.assertEqual(list(iter_steps("STEP 1\r\nBoil water.\r\n"
+                                         "2) Add pasta.")),
+                         ["Boil water", "Add pasta"])
+
+    def test_step_starting_with_a_decimal(self):
+        self.assertEqual(list(iter_steps("1.5 kg of potatoes, peeled.")),
+                         ["1.5 kg of potatoes, peeled"])
+
+    def test_abbreviations_do_not_split(self):
+        self.assertEqual(list(iter_steps("Add approx. 2 tbsp. oil. Stir.")),
+                         ["Add approx. 2 tbsp. oil", "Stir"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,261 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .recipe_index import tokenize
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Levenshtein distance of two words, bounded for speed.
+
+    Args:
+        a (str): first word
+        b (str): second word
+        limit (int): the largest distance of interest
+
+    Returns:
+        int: the distance, or limit + 1 if it is larger than limit
+
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, char in enumerate(a, 1):
+        current = [i]
+        for j, other in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1,
+                               previous[j - 1] + (char != other)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def trigrams(word: str) -> Set[str]:
+    padded = f'  {word} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def max_typos(word: str) -> int:
+    """Edits tolerated when correcting a word; short words must be exact."""
+    if len(word) <= 3:
+        return 0
+    return 1 if len(word) <= 5 else 2
+
+
+class TitleIndex:
+
+    def __init__(self, min_score: float = 0.3):
+        """Fuzzy index over the titles of all known recipes.
+
+        Each query word is corrected to the closest title word (candidates
+        share a trigram with it and are verified by edit distance), then the
+        titles containing the corrected words are ranked by how much of the
+        title the query covers.
+
+        Args:
+            min_score (float): score below which a title is not a match
+        """
+        self.min_score = min_score
+        self._titles: Dict[str, str] = {}
+        self._title_words: Dict[str, Tuple[str, ...]] = {}
+        self._postings: Dict[str, Set[str]] = {}
+        self._trigrams: Dict[str, Set[str]] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._titles)
+
+    def add(self, meal_id: str, title: Optional[str]) -> None:
+        """Add or replace the title of a recipe.
+
+        Args:
+            meal_id (str): TheMealDB recipe id
+            title (str): the strMeal value
+
+        Returns:
+            None
+
+        """
+        words = tuple(tokenize(title))
+        if not meal_id or not words:
+            return
+        with self._lock:
+            if self._title_words.get(meal_id) == words:
+                return
+            self._remove(meal_id)
+            self._titles[meal_id] = title
+            self._title_words[meal_id] = words
+            for word in words:
+                if word not in self._postings:
+                    self._postings[word] = set()
+                    for trigram in trigrams(word):
+                        self._trigrams.setdefault(trigram, set()).add(word)
+                self._postings[word].add(meal_id)
+
+    def add_meals(self, meals: Optional[Iterable[dict]]) -> int:
+        """Add the titles of TheMealDB-format recipes.
+
+        Args:
+            meals (Iterable[dict]): recipes, e.g. the "meals" of a response
+
+        Returns:
+            int: number of recipes with a title
+
+        """
+        count = 0
+        for meal in meals or ():
+            if meal.get('idMeal') and meal.get('strMeal'):
+                self.add(meal['idMeal'], meal['strMeal'])
+                count += 1
+        return count
+
+    def correct(self, word: str) -> Optional[Tuple[str, int]]:
+        """Find the title word closest to a (possibly misheard) word.
+
+        Args:
+            word (str): a lowercase query word
+
+        Returns:
+            tuple: the title word and its edit distance, None if no title
+                word is close enough
+
+        """
+        if word in self._postings:
+            return word, 0
+        limit = max_typos(word)
+        if not limit:
+            return None
+        candidates = set()
+        for trigram in trigrams(word):
+            candidates.update(self._trigrams.get(trigram, ()))
+        best = None
+        for candidate in sorted(candidates):
+            distance = edit_distance(word, candidate, limit)
+            if distance <= limit and (best is None or distance < best[1]):
+                best = candidate, distance
+        return best
+
+    def search(self, query: str, limit: int = 5) -> List[Tuple[str, str, float]]:
+        """Rank the titles matching a query.
+
+        Args:
+            query (str): the recipe name as heard, e.g. "lazagna"
+            limit (int): maximum number of results
+
+        Returns:
+            list: (meal_id, title, score) tuples, best first; the score is 1
+                for an exact title match
+
+        """
+        words = tokenize(query)
+        if not words:
+            return []
+        with self._lock:
+            # a corrected word counts for less the more edits it needed
+            weights = {}
+            for word in words:
+                corrected = self.correct(word)
+                if corrected:
+                    title_word, distance = corrected
+                    weight = 1 - distance / len(word)
+                    weights[title_word] = max(weights.get(title_word, 0),
+                                              weight)
+            candidates = set()
+            for title_word in weights:
+                candidates.update(self._postings[title_word])
+            results = []
+            for meal_id in candidates:
+                title_words = set(self._title_words[meal_id])
+                matched = [weight for title_word, weight in weights.items()
+                           if title_word in title_words]
+                score = sum(matched) / \
+                    (len(set(words)) + len(title_words) - len(matched))
+                if score >= self.min_score:
+                    results.append((meal_id, self._titles[meal_id], score))
+        results.sort(key=lambda result: (-result[2], result[1]))
+        return results[:limit]
+
+    def best(self, query: str) -> Optional[Tuple[str, str]]:
+        """Get the best title containing every word of a query.
+
+        A title sharing only some of the words ("Fish Pie" for "apple pie")
+        is not returned, since TheMealDB's own search may know a better one.
+
+        Args:
+            query (str): the recipe name as heard, e.g. "lazagna"
+
+        Returns:
+            tuple: (meal_id, title), None if no title has every (corrected)
+                query word
+
+        """
+        words = tokenize(query)
+        if not words:
+            return None
+        with self._lock:
+            corrected = [self.correct(word) for word in words]
+            if None in corrected:
+                return None
+            needed = {title_word for title_word, _ in corrected}
+            for meal_id, title, _ in self.search(query, limit=len(self)):
+                if needed.issubset(self._title_words[meal_id]):
+                    return meal_id, title
+        return None
+
+    def _remove(self, meal_id: str) -> None:
+        self._titles.pop(meal_id, None)
+        for word in self._title_words.pop(meal_id, ()):
+            ids = self._postings.get(word)
+            if ids is None:
+                continue
+            ids.discard(meal_id)
+            if not ids:
+                del self._postings[word]
+                for trigram in trigrams(word):
+                    words = self._trigrams.get(trigram)
+                    if words is not None:
+                        words.discard(word)
+                        if not words:
+                            del self._trigrams[trigram]
+
+
+_titles = TitleIndex()
+
+
+def get_titles() -> TitleIndex:
+    """Get the module-level title index shared by the search strategies."""
+    return _titles
+
+
+def set_titles(titles: TitleIndex) -> None:
+    """Replace the module-level title index."""
+    global _titles
+    _titles = titles